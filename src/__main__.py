@@ -6,12 +6,14 @@ bot lifecycle management, and graceful shutdown handling.
 
 import asyncio
 import logging
+import queue
 import signal
 import sys
-from typing import Any
+from collections.abc import Callable
+from logging.handlers import QueueHandler, QueueListener
 
 from .bot import VoiceDiaryBot
-from .settings import Settings
+from .settings import BotMode, Settings
 
 
 class Application:
@@ -22,33 +24,60 @@ class Application:
         self.bot: VoiceDiaryBot | None = None
         self.settings: Settings | None = None
         self._shutdown_event = asyncio.Event()
+        self._log_listener: QueueListener | None = None
+        self._queue_handler: QueueHandler | None = None
+        self._stream_handler: logging.Handler | None = None
 
     def setup_logging(self) -> None:
-        """Configure application logging."""
+        """Configure application logging.
+
+        Records are enqueued by a QueueHandler and written to stdout by a
+        background QueueListener, so logging never blocks the event loop.
+        """
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+
+        # QueueHandler only merges args into the message; the listener applies the real format
+        log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+        queue_handler = QueueHandler(log_queue)
+        queue_handler.setFormatter(logging.Formatter("%(message)s"))
         logging.basicConfig(
             level=logging.INFO,
-            format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
             handlers=[
-                logging.StreamHandler(sys.stdout),
+                queue_handler,
             ],
         )
 
+        self._log_listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        self._log_listener.start()
+        self._queue_handler = queue_handler
+        self._stream_handler = stream_handler
+
         # Set discord.py logging level to WARNING to reduce noise
         logging.getLogger("discord").setLevel(logging.WARNING)
         logging.getLogger("discord.http").setLevel(logging.WARNING)
 
     def setup_signal_handlers(self) -> None:
-        """Setup signal handlers for graceful shutdown."""
+        """Setup signal handlers for graceful shutdown.
+
+        Must be called from within the running event loop so that signals are
+        delivered through the loop instead of interrupting it from a C handler.
+        """
+        loop = asyncio.get_running_loop()
 
-        def signal_handler(signum: int, frame: Any) -> None:
+        def signal_handler(signum: int) -> None:
             """Handle shutdown signals."""
             logger = logging.getLogger(__name__)
             logger.info(f"Received signal {signum}, initiating shutdown...")
             self._shutdown_event.set()
 
         # Register signal handlers
-        signal.signal(signal.SIGINT, signal_handler)
-        signal.signal(signal.SIGTERM, signal_handler)
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, signal_handler, signum)
+            except NotImplementedError:
+                # Event loops without signal support (e.g. Windows): hand off to the loop thread-safely
+                signal.signal(signum, lambda sig, _frame: loop.call_soon_threadsafe(signal_handler, sig))
 
     async def initialize(self) -> None:
         """Initialize application components."""
@@ -64,6 +93,17 @@ class Application:
             self.bot = VoiceDiaryBot(self.settings)
             logger.info("Bot initialized successfully")
 
+            # Validate FFmpeg before connecting so the first message isn't delayed (video mode only)
+            if self.settings.bot_mode == BotMode.VIDEO:
+                if not await self.bot.ffmpeg.validate_ffmpeg_installation():
+                    raise RuntimeError("FFmpeg is not installed or not accessible")
+                logger.info("FFmpeg installation validated successfully")
+                await self.bot.ffmpeg.detect_video_encoder()
+                await self.bot.ffmpeg.detect_audio_encoder()
+                await self.bot.ffmpeg.prepare_background()
+            else:
+                logger.info("Running in transcription mode - FFmpeg validation skipped")
+
         except Exception as e:
             logger.error(f"Failed to initialize application: {e}")
             raise
@@ -121,6 +161,39 @@ class Application:
 
         logger.info("Application shutdown complete")
 
+    def stop_logging(self) -> None:
+        """Flush queued log records and stop the background listener.
+
+        The root logger switches back to writing stdout directly, so records
+        logged afterwards (e.g. fatal errors on exit) are still emitted.
+        """
+        if self._log_listener is None:
+            return
+
+        self._log_listener.stop()
+        self._log_listener = None
+
+        root = logging.getLogger()
+        if self._queue_handler is not None:
+            root.removeHandler(self._queue_handler)
+            self._queue_handler = None
+        if self._stream_handler is not None:
+            root.addHandler(self._stream_handler)
+
+
+def event_loop_factory() -> Callable[[], asyncio.AbstractEventLoop] | None:
+    """Return uvloop's event loop factory when uvloop is installed.
+
+    Returns:
+        Optional[Callable]: uvloop loop factory, None to use the default asyncio loop
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return None
+
+    return uvloop.new_event_loop
+
 
 async def main() -> None:
     """Main entry point."""
@@ -140,12 +213,16 @@ async def main() -> None:
     except Exception as e:
         logging.getLogger(__name__).error(f"Application failed: {e}")
         sys.exit(1)
+    finally:
+        # Stop the listener once, after the last record logged through the queue
+        app.stop_logging()
 
 
 if __name__ == "__main__":
     # Run the application
     try:
-        asyncio.run(main())
+        with asyncio.Runner(loop_factory=event_loop_factory()) as runner:
+            runner.run(main())
     except KeyboardInterrupt:
         logging.getLogger(__name__).info("Shutdown complete")
     except Exception as e:
@@ -4,7 +4,10 @@ Handles Discord integration including message events, file downloads,
 processing coordination, and user notifications.
 """
 
+import asyncio
 import logging
+import os
+from collections.abc import AsyncIterator, Awaitable, Callable
 from pathlib import Path
 from typing import Any
 
@@ -18,6 +21,25 @@ from .transcription import TranscriptionHandler
 
 logger = logging.getLogger(__name__)
 
+# File extensions treated as audio even when Discord omits the content type
+AUDIO_EXTENSIONS = frozenset({".mp3", ".m4a", ".ogg", ".oga", ".wav", ".opus", ".flac", ".webm", ".aac"})
+
+# Discord reply templates
+MSG_PROCESSING_BATCH = "🎵 Processing {} audio files…"
+MSG_PROCESSING_VIDEO = "🎵 Processing audio file: `{}`"
+MSG_PROCESSING_TRANSCRIPTION = "🎤 Transcribing audio: `{}`"
+MSG_VIDEO_SUCCESS = "✅ Successfully converted `{}` to video! Output: `{}`"
+MSG_AUDIO_SUCCESS = "✅ Successfully converted `{}` to audio! Output: `{}`"
+MSG_TRANSCRIPTION_SUCCESS = "✅ Transcribed `{}`! Saved to: `{}`"
+MSG_DOWNLOAD_ERROR = "❌ Failed to download `{}`: Network error"
+MSG_CONVERT_ERROR = "❌ Failed to convert `{}`: Video processing error"
+MSG_PROCESSING_ERROR = "❌ Unexpected error processing `{}`"
+MSG_TRANSCRIPTION_ERROR = "❌ Unexpected error transcribing `{}`"
+MSG_INVALID_MODE = "❌ Invalid bot mode configuration"
+
+# Chunk size used when streaming attachment downloads to disk
+DOWNLOAD_CHUNK_SIZE = 1 << 20  # 1MB
+
 
 class VoiceDiaryBot:
     """Discord bot that converts voice attachments to MP4 videos.
@@ -37,6 +59,23 @@ class VoiceDiaryBot:
         self.ffmpeg = FFmpegRunner(settings)
         self.transcription = TranscriptionHandler(settings)
 
+        # Cache immutable settings read on every message
+        self._channel_id = settings.channel_id
+        self._bot_mode = settings.bot_mode
+        self._max_file_size = settings.max_file_size
+        self._convert_success_template = MSG_AUDIO_SUCCESS if settings.audio_only else MSG_VIDEO_SUCCESS
+
+        # Resolve the mode handler once; the mode never changes at runtime, so
+        # on_message calls it directly without a per-attachment dispatch frame
+        mode_handlers: dict[BotMode, Callable[[discord.Message, discord.Attachment, discord.Message | None], Awaitable[str]]] = {
+            BotMode.VIDEO: self._process_video_mode,
+            BotMode.TRANSCRIPTION: self._process_transcription_mode,
+        }
+        self._mode_handler = mode_handlers.get(settings.bot_mode, self._process_unknown_mode)
+
+        # Shared HTTP session for attachment downloads (created on ready)
+        self._http: aiohttp.ClientSession | None = None
+
         # Configure Discord intents
         intents = discord.Intents.default()
         intents.message_content = True
@@ -55,14 +94,8 @@ class VoiceDiaryBot:
         logger.info(f"Monitoring channel ID: {self.settings.channel_id}")
         logger.info(f"Bot mode: {self.settings.bot_mode.value}")
 
-        # Validate FFmpeg installation (only for video mode)
-        if self.settings.bot_mode == BotMode.VIDEO:
-            if not await self.ffmpeg.validate_ffmpeg_installation():
-                logger.error("FFmpeg is not installed or not accessible!")
-            else:
-                logger.info("FFmpeg installation validated successfully")
-        else:
-            logger.info("Running in transcription mode - FFmpeg validation skipped")
+        # Create pooled HTTP session once so downloads reuse keep-alive connections
+        self._get_http_session()
 
     async def on_message(self, message: discord.Message) -> None:
         """Handle incoming Discord messages.
@@ -70,31 +103,53 @@ class VoiceDiaryBot:
         Args:
             message: Discord message object
         """
-        logger.info(f"Received message from {message.author} in channel {message.channel.id} (monitored: {self.settings.channel_id})")
+        logger.debug("Received message from %s in channel %s (monitored: %s)", message.author, message.channel.id, self._channel_id)
         # Ignore bot's own messages
         if message.author == self.client.user:
             logger.debug("Ignoring bot's own message")
             return
 
         # Check if message is in the monitored channel
-        if message.channel.id != self.settings.channel_id:
-            logger.debug(f"Message not in monitored channel: {message.channel.id} != {self.settings.channel_id}")
+        if message.channel.id != self._channel_id:
+            logger.debug("Message not in monitored channel: %s != %s", message.channel.id, self._channel_id)
             return
 
-        logger.info(f"Processing message in monitored channel. Attachments: {len(message.attachments)}")
+        logger.debug("Processing message in monitored channel. Attachments: %d", len(message.attachments))
 
         # Check for audio attachments
         audio_attachments = self._get_audio_attachments(message)
 
         if not audio_attachments:
-            logger.info("No audio attachments found")
+            logger.debug("No audio attachments found")
             return
 
-        logger.info(f"Found {len(audio_attachments)} audio attachment(s)")
+        logger.debug("Found %d audio attachment(s)", len(audio_attachments))
+
+        # Multiple attachments share one status reply that is edited once with all results
+        status_msg = None
+        if len(audio_attachments) > 1:
+            status_msg = await message.reply(MSG_PROCESSING_BATCH.format(len(audio_attachments)))
+
+        # Process audio attachments concurrently
+        handler = self._mode_handler
+        results = await asyncio.gather(
+            *(handler(message, attachment, status_msg) for attachment in audio_attachments),
+            return_exceptions=True,
+        )
+
+        summary_lines = []
+        for attachment, result in zip(audio_attachments, results, strict=True):
+            if isinstance(result, BaseException):
+                logger.error(f"Failed to process {attachment.filename}: {result}")
+                summary_lines.append(MSG_PROCESSING_ERROR.format(attachment.filename))
+            else:
+                summary_lines.append(result)
 
-        # Process each audio attachment
-        for attachment in audio_attachments:
-            await self._process_audio_attachment(message, attachment)
+        if status_msg is not None:
+            try:
+                await status_msg.edit(content="\n".join(summary_lines))
+            except discord.DiscordException as e:
+                logger.error(f"Failed to update status message: {e}")
 
     async def on_error(self, event: str, *args: Any, **kwargs: Any) -> None:
         """Handle Discord client errors.
@@ -113,44 +168,53 @@ class VoiceDiaryBot:
         Returns:
             list[discord.Attachment]: List of audio attachments
         """
-        audio_attachments = []
+        max_size = self._max_file_size
+        audio_attachments: list[discord.Attachment] = []
+        append = audio_attachments.append
 
         for attachment in message.attachments:
-            # Check if attachment is an audio file
-            if attachment.content_type and attachment.content_type.startswith("audio/"):
-                # Check file size
-                if attachment.size > self.settings.max_file_size:
-                    logger.warning(f"Audio file {attachment.filename} is too large: " f"{attachment.size} bytes (max: {self.settings.max_file_size})")
-                    continue
+            # Check if attachment is an audio file (extension lookup first, then content type)
+            extension = os.path.splitext(attachment.filename)[1].lower()
+            if extension not in AUDIO_EXTENSIONS and not (attachment.content_type or "").startswith("audio/"):
+                continue
+
+            # Check file size
+            if attachment.size > max_size:
+                logger.warning(f"Audio file {attachment.filename} is too large: {attachment.size} bytes (max: {max_size})")
+                continue
 
-                audio_attachments.append(attachment)
+            append(attachment)
 
         return audio_attachments
 
-    async def _process_audio_attachment(self, message: discord.Message, attachment: discord.Attachment) -> None:
-        """Process a single audio attachment.
+    async def _process_unknown_mode(
+        self, message: discord.Message, attachment: discord.Attachment, status_msg: discord.Message | None = None
+    ) -> str:
+        """Report an attachment that cannot be processed because the bot mode is invalid.
 
         Args:
             message: Original Discord message
-            attachment: Audio attachment to process
+            attachment: Audio attachment that was not processed
+            status_msg: Shared status message; when set, no per-file replies are sent
+
+        Returns:
+            str: Error text for this attachment
         """
-        logger.info(f"Processing audio attachment: {attachment.filename}")
-
-        # Branch based on bot mode
-        if self.settings.bot_mode == BotMode.VIDEO:
-            await self._process_video_mode(message, attachment)
-        elif self.settings.bot_mode == BotMode.TRANSCRIPTION:
-            await self._process_transcription_mode(message, attachment)
-        else:
-            logger.error(f"Unknown bot mode: {self.settings.bot_mode}")
-            await message.reply("❌ Invalid bot mode configuration")
-
-    async def _process_video_mode(self, message: discord.Message, attachment: discord.Attachment) -> None:
+        logger.error(f"Unknown bot mode: {self._bot_mode}")
+        return await self._send_error_message(message, status_msg, MSG_INVALID_MODE)
+
+    async def _process_video_mode(
+        self, message: discord.Message, attachment: discord.Attachment, status_msg: discord.Message | None = None
+    ) -> str:
         """Process audio attachment in video mode.
 
         Args:
             message: Original Discord message
             attachment: Audio attachment to process
+            status_msg: Shared status message; when set, no per-file replies are sent
+
+        Returns:
+            str: Result text for this attachment
         """
         # Generate file paths
         inbox_path = self.storage.get_inbox_path(attachment.filename)
@@ -158,61 +222,81 @@ class VoiceDiaryBot:
 
         try:
             # Send initial processing message
-            processing_msg = await message.reply(f"🎵 Processing audio file: `{attachment.filename}`")
-
-            # Download audio file
-            await self._download_attachment(attachment, inbox_path)
-            logger.info(f"Downloaded {attachment.filename} to {inbox_path}")
-
-            # Convert to video
-            await self.ffmpeg.convert_audio_to_video(inbox_path, output_path)
+            processing_msg = None
+            if status_msg is None:
+                processing_msg = await message.reply(MSG_PROCESSING_VIDEO.format(attachment.filename))
+
+            if self.ffmpeg.needs_seekable_input(attachment.filename):
+                # Download audio file
+                await self._download_attachment(attachment, inbox_path)
+                logger.info(f"Downloaded {attachment.filename} to {inbox_path}")
+
+                # Reuse the output of an identical earlier upload converted the same way
+                digest = await asyncio.to_thread(self.storage.content_hash, inbox_path, self.ffmpeg.conversion_signature())
+                existing_output = self.storage.find_output_by_hash(digest)
+                if existing_output is not None:
+                    self.storage.link_output(existing_output, output_path)
+                    logger.info(f"Reused existing output {existing_output} for duplicate upload {attachment.filename}")
+                else:
+                    # Convert to video
+                    self.storage.release_output_path(output_path)
+                    await self.ffmpeg.convert_audio_to_video(inbox_path, output_path)
+                    self.storage.record_output_hash(digest, output_path)
+            else:
+                # Stream the download straight into FFmpeg, skipping the inbox file
+                self.storage.release_output_path(output_path)
+                await self.ffmpeg.convert_stream_to_video(self._iter_attachment(attachment), attachment.filename, output_path)
             logger.info(f"Converted {attachment.filename} to {output_path}")
 
             # Send success message
-            await processing_msg.edit(content=f"✅ Successfully converted `{attachment.filename}` to video! " f"Output: `{output_path.name}`")
-
-            # Cleanup inbox file
-            self.storage.cleanup_inbox_file(inbox_path)
+            result = self._convert_success_template.format(attachment.filename, output_path.name)
+            if processing_msg is not None:
+                await processing_msg.edit(content=result)
 
             # Optionally cleanup output file
             if self.settings.delete_on_success:
                 self.storage.cleanup_output_file(output_path)
                 logger.info(f"Cleaned up output file: {output_path}")
 
+            return result
+
         except aiohttp.ClientError as e:
-            error_msg = f"❌ Failed to download `{attachment.filename}`: Network error"
             logger.error(f"Download failed for {attachment.filename}: {e}")
-            await self._send_error_message(message, error_msg)
+            return await self._send_error_message(message, status_msg, MSG_DOWNLOAD_ERROR, attachment.filename)
 
         except FFmpegError as e:
-            error_msg = f"❌ Failed to convert `{attachment.filename}`: Video processing error"
             logger.error(f"FFmpeg error for {attachment.filename}: {e}")
-            await self._send_error_message(message, error_msg)
-
-            # Cleanup inbox file on error
-            self.storage.cleanup_inbox_file(inbox_path)
+            return await self._send_error_message(message, status_msg, MSG_CONVERT_ERROR, attachment.filename)
 
         except Exception as e:
-            error_msg = f"❌ Unexpected error processing `{attachment.filename}`"
             logger.exception(f"Unexpected error processing {attachment.filename}: {e}")
-            await self._send_error_message(message, error_msg)
+            return await self._send_error_message(message, status_msg, MSG_PROCESSING_ERROR, attachment.filename)
 
-            # Cleanup inbox file on error
+        finally:
+            # Inbox file is removed exactly once, whatever the outcome
             self.storage.cleanup_inbox_file(inbox_path)
 
-    async def _process_transcription_mode(self, message: discord.Message, attachment: discord.Attachment) -> None:
+    async def _process_transcription_mode(
+        self, message: discord.Message, attachment: discord.Attachment, status_msg: discord.Message | None = None
+    ) -> str:
         """Process audio attachment in transcription mode.
 
         Args:
             message: Original Discord message
             attachment: Audio attachment to process
+            status_msg: Shared status message; when set, no per-file replies are sent
+
+        Returns:
+            str: Result text for this attachment
         """
         # Generate file path
         inbox_path = self.storage.get_inbox_path(attachment.filename)
 
         try:
             # Send initial processing message
-            processing_msg = await message.reply(f"🎤 Transcribing audio: `{attachment.filename}`")
+            processing_msg = None
+            if status_msg is None:
+                processing_msg = await message.reply(MSG_PROCESSING_TRANSCRIPTION.format(attachment.filename))
 
             # Download audio file
             await self._download_attachment(attachment, inbox_path)
@@ -223,24 +307,24 @@ class VoiceDiaryBot:
             logger.info(f"Transcription complete: {markdown_path}")
 
             # Send success message
-            await processing_msg.edit(content=f"✅ Transcription complete! Saved to: `{markdown_path.name}`")
-
-            # Cleanup inbox file
-            self.storage.cleanup_inbox_file(inbox_path)
+            result = MSG_TRANSCRIPTION_SUCCESS.format(attachment.filename, markdown_path.name)
+            if processing_msg is not None:
+                await processing_msg.edit(content=result)
 
             # Note: Markdown files are never deleted in transcription mode
 
+            return result
+
         except aiohttp.ClientError as e:
-            error_msg = f"❌ Failed to download `{attachment.filename}`: Network error"
             logger.error(f"Download failed for {attachment.filename}: {e}")
-            await self._send_error_message(message, error_msg)
+            return await self._send_error_message(message, status_msg, MSG_DOWNLOAD_ERROR, attachment.filename)
 
         except Exception as e:
-            error_msg = f"❌ Unexpected error transcribing `{attachment.filename}`"
             logger.exception(f"Unexpected error transcribing {attachment.filename}: {e}")
-            await self._send_error_message(message, error_msg)
+            return await self._send_error_message(message, status_msg, MSG_TRANSCRIPTION_ERROR, attachment.filename)
 
-            # Cleanup inbox file on error
+        finally:
+            # Inbox file is removed exactly once, whatever the outcome
             self.storage.cleanup_inbox_file(inbox_path)
 
     async def _download_attachment(self, attachment: discord.Attachment, output_path: Path) -> None:
@@ -252,30 +336,78 @@ class VoiceDiaryBot:
 
         Raises:
             aiohttp.ClientError: If download fails
+            ValueError: If the attachment exceeds the size limit
+        """
+        # Writes run off the event loop; size limits are enforced while streaming
+        with open(output_path, "wb") as f:
+            async for chunk in self._iter_attachment(attachment):
+                await asyncio.to_thread(f.write, chunk)
+
+    async def _iter_attachment(self, attachment: discord.Attachment) -> AsyncIterator[bytes]:
+        """Stream Discord attachment content.
+
+        Args:
+            attachment: Discord attachment to download
+
+        Yields:
+            bytes: Chunks of attachment data
+
+        Raises:
+            aiohttp.ClientError: If download fails
+            ValueError: If the attachment exceeds the size limit
         """
-        async with aiohttp.ClientSession() as session:
-            async with session.get(attachment.url) as response:
-                response.raise_for_status()
+        # Reject oversized files before any data is transferred
+        if attachment.size > self._max_file_size:
+            raise ValueError(f"Attachment exceeds size limit: {attachment.filename}")
+
+        session = self._get_http_session()
+        async with session.get(attachment.url) as response:
+            response.raise_for_status()
+
+            if response.content_length is not None and response.content_length > self._max_file_size:
+                raise ValueError(f"Attachment exceeds size limit: {attachment.filename}")
+
+            # Large chunks amortize per-iteration overhead
+            received = 0
+            async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                received += len(chunk)
+                if received > self._max_file_size:
+                    raise ValueError(f"Attachment exceeds size limit: {attachment.filename}")
+                yield chunk
 
-                with open(output_path, "wb") as f:
-                    async for chunk in response.content.iter_chunked(8192):
-                        f.write(chunk)
+    def _get_http_session(self) -> aiohttp.ClientSession:
+        """Return the shared HTTP session, creating it if needed.
 
-        # Validate downloaded file size
-        if not self.storage.validate_file_size(output_path):
-            raise ValueError(f"Downloaded file exceeds size limit: {output_path}")
+        Returns:
+            aiohttp.ClientSession: Pooled session used for attachment downloads
+        """
+        if self._http is None or self._http.closed:
+            connector = aiohttp.TCPConnector(limit=32, limit_per_host=8, ttl_dns_cache=300, keepalive_timeout=75)
+            self._http = aiohttp.ClientSession(connector=connector)
+        return self._http
 
-    async def _send_error_message(self, message: discord.Message, error_text: str) -> None:
+    async def _send_error_message(self, message: discord.Message, status_msg: discord.Message | None, template: str, *args: Any) -> str:
         """Send error message to Discord channel.
 
+        The reply is skipped when a shared status message is in use; the caller
+        includes the returned text in its summary instead.
+
         Args:
             message: Original message to reply to
-            error_text: Error message to send
+            status_msg: Shared status message, if any
+            template: Error message template
+            *args: Values substituted into the template
+
+        Returns:
+            str: Formatted error message
         """
-        try:
-            await message.reply(error_text)
-        except discord.DiscordException as e:
-            logger.error(f"Failed to send error message: {e}")
+        error_text = template.format(*args)
+        if status_msg is None:
+            try:
+                await message.reply(error_text)
+            except discord.DiscordException as e:
+                logger.error(f"Failed to send error message: {e}")
+        return error_text
 
     async def start(self) -> None:
         """Start the Discord bot."""
@@ -285,6 +417,9 @@ class VoiceDiaryBot:
     async def close(self) -> None:
         """Close the Discord bot connection."""
         logger.info("Closing Discord bot...")
+        if self._http is not None and not self._http.closed:
+            await self._http.close()
+        await self.transcription.close()
         await self.client.close()
 
     def run(self) -> None:
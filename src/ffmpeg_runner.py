@@ -6,12 +6,96 @@ to MP4 videos with configurable parameters and robust error handling.
 
 import asyncio
 import logging
+import os
+import shutil
+from collections import deque
+from collections.abc import AsyncIterator
 from pathlib import Path
+from typing import Any
 
 from .settings import Settings
 
 logger = logging.getLogger(__name__)
 
+# Containers whose index may sit at the end of the file and therefore cannot be demuxed from a pipe
+SEEKABLE_INPUT_SUFFIXES = frozenset({".m4a", ".mp4", ".mov", ".3gp"})
+
+# Software H.264 encoder used when no hardware encoder is available
+DEFAULT_VIDEO_ENCODER = "libx264"
+
+# Hardware H.264 encoders in order of preference (NVIDIA, Intel, macOS)
+HARDWARE_VIDEO_ENCODERS = ("h264_nvenc", "h264_qsv", "h264_videotoolbox")
+
+# Native AAC encoder, always available
+DEFAULT_AUDIO_ENCODER = "aac"
+
+# Fraunhofer AAC encoder, only present in builds configured with --enable-libfdk-aac
+FDK_AAC_ENCODER = "libfdk_aac"
+
+# Encoder-specific FFmpeg options
+VIDEO_ENCODER_OPTIONS: dict[str, tuple[str, ...]] = {
+    "libx264": (
+        "-preset",
+        "ultrafast",  # Frames are identical, so extra analysis buys no quality
+        "-tune",
+        "stillimage,fastdecode",
+        "-pix_fmt",
+        "yuv420p",
+    ),
+    "h264_nvenc": ("-preset", "p1", "-tune", "ll", "-rc", "constqp", "-qp", "28", "-pix_fmt", "yuv420p"),
+    "h264_qsv": ("-preset", "veryfast", "-global_quality", "28", "-pix_fmt", "nv12"),
+    "h264_videotoolbox": ("-q:v", "60", "-pix_fmt", "yuv420p"),
+}
+
+# Leading arguments shared by every conversion command
+FFMPEG_GLOBAL_ARGS = (
+    "ffmpeg",
+    "-y",  # Overwrite output file
+    "-loglevel",
+    "error",  # Only errors reach stderr
+)
+
+# Still-image video stream settings
+STILL_FRAME_ARGS = (
+    "-r",
+    "1",  # Encode a single frame per second
+    "-g",
+    "1",  # Every frame is a keyframe for instant seeking
+)
+
+# Trailing output options for MP4 video
+VIDEO_OUTPUT_ARGS = (
+    "-ac",
+    "1",  # Mono audio
+    "-shortest",  # Stop when shortest input ends
+    "-movflags",
+    "+faststart",  # Enable fast start for web playback
+    "-avoid_negative_ts",
+    "make_zero",  # Start output timestamps at zero
+)
+
+# Trailing output options for audio-only M4A
+AUDIO_ONLY_OUTPUT_ARGS = (
+    "-movflags",
+    "+faststart",  # Enable fast start for web playback
+    "-f",
+    "ipod",  # M4A container
+)
+
+# Seconds between progress log lines for long conversions
+PROGRESS_LOG_INTERVAL = 30
+
+# Seconds allowed for `ffmpeg -version` when validating the installation
+FFMPEG_VERSION_TIMEOUT = 10
+
+# Number of trailing stderr lines kept for error reporting
+STDERR_TAIL_LINES = 256
+
+
+async def _single_chunk(data: bytes) -> AsyncIterator[bytes]:
+    """Yield in-memory data as a single chunk."""
+    yield data
+
 
 class FFmpegError(Exception):
     """Exception raised when FFmpeg processing fails."""
@@ -34,6 +118,9 @@ class FFmpegRunner:
     error reporting, and output validation.
     """
 
+    # Round-robin counter spreading concurrent conversions across CPU sets
+    _affinity_counter = 0
+
     def __init__(self, settings: Settings) -> None:
         """Initialize FFmpeg runner with settings.
 
@@ -44,61 +131,158 @@ class FFmpegRunner:
         self.timeout = settings.processing_timeout
         self.audio_bitrate = settings.audio_bitrate
         self.background_image = settings.background_image
+        self.threads = settings.ffmpeg_threads
+        self._semaphore = asyncio.Semaphore(settings.max_concurrent_ffmpeg)
+
+        # Raw YUV background frame and its size, set by prepare_background()
+        self._prepared_background: tuple[Path, str] | None = None
+
+        self.audio_only = settings.audio_only
+        self.audio_encoder = DEFAULT_AUDIO_ENCODER
+        self._video_encoder = DEFAULT_VIDEO_ENCODER
+
+        # Command templates around the per-call paths, rebuilt when encoders or background change
+        self._build_command_templates()
+
+        # Absolute tool paths, resolved once; an absolute path lets subprocess use posix_spawn
+        self._executables = {name: shutil.which(name) or name for name in ("ffmpeg", "ffprobe")}
+
+        # Cached FFmpeg availability (only successful checks are cached)
+        self._ffmpeg_ok = False
+        self._ffmpeg_lock = asyncio.Lock()
 
-    def build_command(self, input_audio: Path, output_video: Path) -> list[str]:
+    def build_command(self, input_audio: Path, output_video: Path, from_stdin: bool = False) -> list[str]:
         """Build FFmpeg command for audio to video conversion.
 
         Args:
             input_audio: Path to input audio file
             output_video: Path to output video file
+            from_stdin: Read audio from stdin (pipe:0) instead of input_audio;
+                input_audio is then only used to choose audio codec handling
 
         Returns:
             list[str]: FFmpeg command as list of arguments
         """
-        # Check if we can copy audio to avoid re-encoding
-        can_copy_audio = self._can_copy_audio(input_audio)
+        if self.audio_only:
+            return self.build_audio_only_command(input_audio, output_video, from_stdin)
 
-        command = [
-            "ffmpeg",
-            "-y",  # Overwrite output file
+        # Copy audio when possible to avoid re-encoding
+        tail = self._video_tail_copy if self._can_copy_audio(input_audio) else self._video_tail_encode
+        return [*self._video_head, "pipe:0" if from_stdin else str(input_audio), *tail, str(output_video)]
+
+    @property
+    def video_encoder(self) -> str:
+        """H.264 encoder used for conversions."""
+        return self._video_encoder
+
+    @video_encoder.setter
+    def video_encoder(self, encoder: str) -> None:
+        self._video_encoder = encoder
+        self._build_command_templates()
+
+    def _build_command_templates(self) -> None:
+        """Precompute command arguments before and after the audio input path.
+
+        build_command then only splices in the per-call paths. Separate tails
+        cover copied and re-encoded audio.
+        """
+        threads_args = ("-threads", str(self.threads))  # Cap threads so concurrent jobs don't oversubscribe CPUs
+        copy_args = ("-c:a", "copy")
+        encode_args = self._audio_encode_args()
+
+        self._video_head = (
+            *FFMPEG_GLOBAL_ARGS,
+            *self._background_input_args(),
+            "-fflags",
+            "+fastseek",  # Demuxer flag, so it goes before the audio input
+            "-i",
+        )
+        video_args = (*threads_args, "-c:v", self._video_encoder, *VIDEO_ENCODER_OPTIONS[self._video_encoder], *STILL_FRAME_ARGS)
+        self._video_tail_copy = (*video_args, *copy_args, *VIDEO_OUTPUT_ARGS)
+        self._video_tail_encode = (*video_args, *encode_args, *VIDEO_OUTPUT_ARGS)
+
+        self._audio_only_head = (*FFMPEG_GLOBAL_ARGS, "-i")
+        audio_only_args = ("-vn", *threads_args)  # Drop any embedded cover art
+        self._audio_only_tail_copy = (*audio_only_args, *copy_args, *AUDIO_ONLY_OUTPUT_ARGS)
+        # Only re-encoded audio gets bitrate and channel settings
+        self._audio_only_tail_encode = (*audio_only_args, *encode_args, "-ac", "1", *AUDIO_ONLY_OUTPUT_ARGS)
+
+    def _background_input_args(self) -> tuple[str, ...]:
+        """Build FFmpeg input arguments for the looping background image.
+
+        Returns:
+            tuple[str, ...]: Input arguments, using the pre-decoded raw frame when available
+        """
+        if self._prepared_background is not None:
+            raw_path, video_size = self._prepared_background
+            return (
+                "-stream_loop",
+                "-1",
+                "-f",
+                "rawvideo",
+                "-pixel_format",
+                "yuv420p",
+                "-video_size",
+                video_size,
+                "-framerate",
+                "1",
+                "-i",
+                str(raw_path),
+            )
+
+        return (
             "-loop",
             "1",
+            "-framerate",
+            "1",  # Still image: one input frame per second is enough
             "-i",
             str(self.background_image),
-            "-i",
-            str(input_audio),
-            "-c:v",
-            "libx264",
-            "-preset",
-            "veryfast",  # Faster encoding, lower memory usage
-            "-profile:v",
-            "baseline",  # Lower complexity profile
-            "-tune",
-            "stillimage",
-            "-pix_fmt",
-            "yuv420p",
-            "-c:a",
-            "copy" if can_copy_audio else "aac",  # Copy audio when possible
-        ]
-
-        # Only add bitrate if we're re-encoding audio
-        if not can_copy_audio:
-            command.extend(["-b:a", f"{self.audio_bitrate}k"])
-
-        command.extend(
-            [
-                "-ac",
-                "1",  # Mono audio
-                "-shortest",  # Stop when shortest input ends
-                "-movflags",
-                "+faststart",  # Enable fast start for web playback
-                "-max_muxing_queue_size",
-                "1024",  # Limit queue size to reduce memory usage
-                str(output_video),
-            ]
         )
 
-        return command
+    def build_audio_only_command(self, input_audio: Path, output_audio: Path, from_stdin: bool = False) -> list[str]:
+        """Build FFmpeg command that muxes audio into an M4A file without video.
+
+        Args:
+            input_audio: Path to input audio file
+            output_audio: Path to output M4A file
+            from_stdin: Read audio from stdin (pipe:0) instead of input_audio
+
+        Returns:
+            list[str]: FFmpeg command as list of arguments
+        """
+        tail = self._audio_only_tail_copy if self._can_copy_audio(input_audio) else self._audio_only_tail_encode
+        return [*self._audio_only_head, "pipe:0" if from_stdin else str(input_audio), *tail, str(output_audio)]
+
+    def needs_seekable_input(self, filename: str) -> bool:
+        """Check if audio must be read from a file rather than piped to FFmpeg.
+
+        Args:
+            filename: Original audio filename
+
+        Returns:
+            bool: True if the container cannot be demuxed from a pipe
+        """
+        return Path(filename).suffix.lower() in SEEKABLE_INPUT_SUFFIXES
+
+    def conversion_signature(self) -> str:
+        """Describe the settings that determine a conversion's output.
+
+        Outputs converted under different signatures are not interchangeable,
+        even for identical input audio.
+
+        Returns:
+            str: Output mode, encoders, audio bitrate and background image identity
+        """
+        parts = ["audio_only" if self.audio_only else "video", self.audio_encoder, str(self.audio_bitrate)]
+        if not self.audio_only:
+            parts += [self._video_encoder, str(self.background_image)]
+            try:
+                background = os.stat(self.background_image)
+            except OSError:
+                pass
+            else:
+                parts += [str(background.st_size), str(background.st_mtime_ns)]
+        return "|".join(parts)
 
     def _can_copy_audio(self, input_audio: Path) -> bool:
         """Check if audio can be copied without re-encoding.
@@ -113,48 +297,60 @@ class FFmpegRunner:
         # A more sophisticated implementation would use ffprobe
         return input_audio.suffix.lower() in [".aac", ".m4a"]
 
-    async def _monitor_process_with_timeout(self, process: asyncio.subprocess.Process, input_audio: Path) -> tuple[bytes, bytes]:
-        """Monitor FFmpeg process with progress logging and timeout handling.
+    async def _spawn(self, program: str, *args: str, **kwargs: Any) -> asyncio.subprocess.Process:
+        """Start an FFmpeg/FFprobe subprocess.
+
+        The program is resolved to its cached absolute path and file
+        descriptors are left to PEP 446 non-inheritance instead of close_fds,
+        which lets CPython launch it with posix_spawn rather than fork + exec.
+
+        Args:
+            program: Program name or path
+            *args: Program arguments
+            **kwargs: Extra arguments for asyncio.create_subprocess_exec
+
+        Returns:
+            asyncio.subprocess.Process: Started process
+        """
+        executable = self._executables.get(program, program)
+        return await asyncio.create_subprocess_exec(executable, *args, close_fds=False, **kwargs)
+
+    async def _monitor_process_with_timeout(self, process: asyncio.subprocess.Process, input_audio: Path) -> bytes:
+        """Wait for FFmpeg process with progress logging and timeout handling.
+
+        A single wait on the process and its stderr reader returns as soon as
+        FFmpeg exits, waking every PROGRESS_LOG_INTERVAL seconds to log progress.
 
         Args:
             process: Running FFmpeg subprocess
             input_audio: Input audio file for logging context
 
         Returns:
-            tuple[bytes, bytes]: stdout and stderr from process
+            bytes: Tail of the process stderr
 
         Raises:
             asyncio.TimeoutError: If process exceeds timeout
         """
-        start_time = asyncio.get_event_loop().time()
-        check_interval = 30  # Check every 30 seconds
-        last_check = start_time
-
-        while process.returncode is None:
-            try:
-                # Wait for process to complete or timeout interval
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(), timeout=min(check_interval, self.timeout - (asyncio.get_event_loop().time() - start_time))
-                )
-                return stdout, stderr
-            except asyncio.TimeoutError:
-                current_time = asyncio.get_event_loop().time()
-                elapsed = current_time - start_time
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+        wait_task = asyncio.create_task(process.wait())
+        stderr_task = asyncio.create_task(self._read_stderr_tail(process.stderr))
+        pending = {wait_task, stderr_task}
 
-                # Check if we've exceeded the total timeout
-                if elapsed >= self.timeout:
-                    raise asyncio.TimeoutError(f"FFmpeg conversion timed out after {elapsed:.1f} seconds") from None
-
-                # Log progress every 30 seconds
-                if current_time - last_check >= check_interval:
-                    logger.info(f"FFmpeg still processing {input_audio.name} - elapsed: {elapsed:.1f}s")
-                    last_check = current_time
+        try:
+            while pending:
+                remaining = self.timeout - (loop.time() - start_time)
+                if remaining <= 0:
+                    raise asyncio.TimeoutError(f"FFmpeg conversion timed out after {loop.time() - start_time:.1f} seconds")
 
-                # Continue monitoring
-                await asyncio.sleep(1)
+                _, pending = await asyncio.wait(pending, timeout=min(PROGRESS_LOG_INTERVAL, remaining))
+                if pending and loop.time() - start_time < self.timeout:
+                    logger.info(f"FFmpeg still processing {input_audio.name} - elapsed: {loop.time() - start_time:.1f}s")
 
-        # Process completed without timeout
-        return await process.communicate()
+            return stderr_task.result()
+        finally:
+            wait_task.cancel()
+            stderr_task.cancel()
 
     async def convert_audio_to_video(self, input_audio: Path, output_video: Path) -> None:
         """Convert audio file to MP4 video with background image.
@@ -171,7 +367,7 @@ class FFmpegRunner:
         if not input_audio.exists():
             raise FileNotFoundError(f"Input audio file not found: {input_audio}")
 
-        if not self.background_image.exists():
+        if not self.audio_only and not self.background_image.exists():
             raise FileNotFoundError(f"Background image not found: {self.background_image}")
 
         # Build FFmpeg command
@@ -180,72 +376,447 @@ class FFmpegRunner:
         logger.info(f"Starting FFmpeg conversion: {input_audio.name} -> {output_video.name}")
         logger.debug(f"FFmpeg command: {' '.join(command)}")
 
+        # Limit how many FFmpeg processes run at once
+        async with self._semaphore:
+            try:
+                # Execute FFmpeg command with timeout
+                process = await self._spawn(
+                    *command,
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+                self._pin_process(process.pid)
+
+                # Monitor process with progress logging
+                stderr = await self._monitor_process_with_timeout(process, input_audio)
+
+                # Check process result and output file
+                self._check_result(process.returncode, stderr, output_video)
+
+                logger.info(f"FFmpeg conversion completed successfully: {output_video.name}")
+
+            except asyncio.TimeoutError as e:
+                # Kill the process if it's still running
+                await self._kill_process(process)
+
+                error_msg = f"FFmpeg conversion timed out after {self.timeout} seconds"
+                logger.error(error_msg)
+                raise FFmpegError(error_msg) from e
+
+            except FileNotFoundError as e:
+                error_msg = "FFmpeg executable not found. Please ensure FFmpeg is installed."
+                logger.error(error_msg)
+                raise FFmpegError(error_msg) from e
+
+            except Exception as e:
+                error_msg = f"Unexpected error during FFmpeg conversion: {str(e)}"
+                logger.error(error_msg)
+                raise FFmpegError(error_msg) from e
+
+    async def convert_stream_to_video(self, audio_chunks: AsyncIterator[bytes], input_name: str, output_video: Path) -> None:
+        """Convert streamed audio to MP4 video by piping it into FFmpeg's stdin.
+
+        Avoids writing the audio to disk before conversion. Containers listed in
+        SEEKABLE_INPUT_SUFFIXES cannot be read from a pipe; use
+        convert_audio_to_video for those.
+
+        Args:
+            audio_chunks: Async iterator yielding audio data
+            input_name: Original audio filename, used to choose audio codec handling
+            output_video: Path to output video file
+
+        Raises:
+            FFmpegError: If FFmpeg command fails or times out
+            FileNotFoundError: If background image doesn't exist
+        """
+        if not self.audio_only and not self.background_image.exists():
+            raise FileNotFoundError(f"Background image not found: {self.background_image}")
+
+        command = self.build_command(Path(input_name), output_video, from_stdin=True)
+
+        logger.info(f"Starting FFmpeg stream conversion: {input_name} -> {output_video.name}")
+        await self._run_with_stdin(command, audio_chunks, output_video)
+
+    async def convert_audio_bytes_to_video(self, audio_bytes: bytes, output_video: Path, suffix: str) -> None:
+        """Convert in-memory audio to MP4 video by piping it into FFmpeg's stdin.
+
+        Suitable for audio that is already held in memory. Containers listed in
+        SEEKABLE_INPUT_SUFFIXES cannot be read from a pipe; use
+        convert_audio_to_video for those.
+
+        Args:
+            audio_bytes: Complete audio file content
+            output_video: Path to output video file
+            suffix: Original file extension (e.g. ".ogg"), used to choose audio codec handling
+
+        Raises:
+            FFmpegError: If FFmpeg command fails or times out
+            FileNotFoundError: If background image doesn't exist
+        """
+        if not self.audio_only and not self.background_image.exists():
+            raise FileNotFoundError(f"Background image not found: {self.background_image}")
+
+        command = self.build_command(Path(f"input{suffix}"), output_video, from_stdin=True)
+
+        logger.info(f"Starting FFmpeg conversion from memory ({len(audio_bytes)} bytes) -> {output_video.name}")
+        await self._run_with_stdin(command, _single_chunk(audio_bytes), output_video)
+
+    async def _run_with_stdin(self, command: list[str], audio_chunks: AsyncIterator[bytes], output_video: Path) -> None:
+        """Run an FFmpeg command that reads its audio input from stdin.
+
+        Args:
+            command: FFmpeg command reading from pipe:0
+            audio_chunks: Async iterator yielding audio data
+            output_video: Path to output video file
+
+        Raises:
+            FFmpegError: If FFmpeg command fails or times out
+        """
+        logger.debug(f"FFmpeg command: {' '.join(command)}")
+
+        # Limit how many FFmpeg processes run at once
+        async with self._semaphore:
+            try:
+                process = await self._spawn(
+                    *command,
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+            except FileNotFoundError as e:
+                error_msg = "FFmpeg executable not found. Please ensure FFmpeg is installed."
+                logger.error(error_msg)
+                raise FFmpegError(error_msg) from e
+
+            self._pin_process(process.pid)
+
+            if process.stdin is None:
+                raise FFmpegError("FFmpeg stdin pipe was not created")
+
+            # Drain stderr while feeding stdin so FFmpeg never blocks on a full pipe
+            stderr_task = asyncio.create_task(self._read_stderr_tail(process.stderr))
+            try:
+                async with asyncio.timeout(self.timeout):
+                    await self._feed_stdin(process.stdin, audio_chunks)
+                    stderr = await stderr_task
+                    await process.wait()
+            except TimeoutError as e:
+                await self._kill_process(process)
+                error_msg = f"FFmpeg conversion timed out after {self.timeout} seconds"
+                logger.error(error_msg)
+                raise FFmpegError(error_msg) from e
+            except BaseException:
+                # Download errors propagate unchanged to the caller
+                await self._kill_process(process)
+                raise
+            finally:
+                stderr_task.cancel()
+
+            self._check_result(process.returncode, stderr, output_video)
+            logger.info(f"FFmpeg conversion completed successfully: {output_video.name}")
+
+    async def _read_stderr_tail(self, stderr: asyncio.StreamReader | None) -> bytes:
+        """Read FFmpeg's stderr until EOF, keeping only the last lines.
+
+        Memory stays bounded however much FFmpeg logs during long conversions.
+
+        Args:
+            stderr: FFmpeg process stderr
+
+        Returns:
+            bytes: Last STDERR_TAIL_LINES lines of output
+        """
+        if stderr is None:
+            return b""
+
+        tail: deque[bytes] = deque(maxlen=STDERR_TAIL_LINES)
+        async for line in stderr:
+            tail.append(line)
+        return b"".join(tail)
+
+    async def _feed_stdin(self, stdin: asyncio.StreamWriter, audio_chunks: AsyncIterator[bytes]) -> None:
+        """Write audio chunks to FFmpeg's stdin and close it.
+
+        Args:
+            stdin: FFmpeg process stdin
+            audio_chunks: Async iterator yielding audio data
+        """
+        try:
+            async for chunk in audio_chunks:
+                stdin.write(chunk)
+                await stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            # FFmpeg exited early; its return code reports the failure
+            logger.debug("FFmpeg closed stdin before all audio was written")
+        finally:
+            stdin.close()
+
+    def _pin_process(self, pid: int) -> None:
+        """Pin an FFmpeg process to its own subset of CPUs.
+
+        Each conversion gets `threads` CPUs, rotating through the available
+        ones so concurrent jobs don't compete for the same cores. Pinning is
+        best effort and skipped where unsupported.
+
+        Args:
+            pid: FFmpeg process ID
+        """
+        if self.threads <= 0 or not hasattr(os, "sched_setaffinity"):
+            return
+
+        cpus = sorted(os.sched_getaffinity(0))
+        if len(cpus) <= self.threads:
+            return
+
+        start = (FFmpegRunner._affinity_counter * self.threads) % len(cpus)
+        FFmpegRunner._affinity_counter += 1
+        allowed = {cpus[(start + i) % len(cpus)] for i in range(self.threads)}
+
+        try:
+            os.sched_setaffinity(pid, allowed)
+        except Exception as e:
+            logger.debug(f"Failed to set CPU affinity for FFmpeg process: {e}")
+
+    async def _kill_process(self, process: asyncio.subprocess.Process) -> None:
+        """Kill FFmpeg process if it is still running.
+
+        Args:
+            process: FFmpeg subprocess
+        """
+        if process.returncode is None:
+            try:
+                process.kill()
+                await process.wait()
+            except Exception as cleanup_error:
+                logger.debug(f"Failed to kill process during cleanup: {cleanup_error}")
+
+    def _check_result(self, return_code: int | None, stderr: bytes, output_video: Path) -> None:
+        """Validate FFmpeg exit status and output file.
+
+        Args:
+            return_code: FFmpeg process return code
+            stderr: Captured FFmpeg stderr
+            output_video: Path to output video file
+
+        Raises:
+            FFmpegError: If FFmpeg failed or produced no usable output
+        """
+        # Check if process completed successfully
+        if return_code != 0:
+            stderr_text = stderr.decode("utf-8", errors="replace")
+            error_msg = f"FFmpeg failed with return code {return_code}"
+            logger.error(f"{error_msg}\nStderr: {stderr_text}")
+            raise FFmpegError(error_msg, return_code, stderr_text)
+
+        # Validate output file was created
+        if not output_video.exists():
+            raise FFmpegError("FFmpeg completed but output file was not created")
+
+        # Validate output file has content
+        if output_video.stat().st_size == 0:
+            raise FFmpegError("FFmpeg created empty output file")
+
+    async def detect_video_encoder(self) -> str:
+        """Select the fastest working H.264 encoder for subsequent conversions.
+
+        Hardware encoders are probed with a tiny test encode, since
+        `ffmpeg -encoders` lists encoders that are compiled in even when the
+        matching hardware is absent.
+
+        Returns:
+            str: Name of the selected video encoder
+        """
+        self.video_encoder = DEFAULT_VIDEO_ENCODER
+        for encoder in HARDWARE_VIDEO_ENCODERS:
+            if await self._probe_encoder(encoder):
+                self.video_encoder = encoder
+                break
+
+        logger.info(f"Using video encoder: {self.video_encoder}")
+        return self.video_encoder
+
+    async def detect_audio_encoder(self) -> str:
+        """Select the AAC encoder used when audio has to be re-encoded.
+
+        libfdk_aac in VBR mode 3 is preferred when compiled in: it is faster
+        than the native encoder and gives smaller files at similar quality.
+
+        Returns:
+            str: Name of the selected audio encoder
+        """
+        encoders = await self._run_tool("ffmpeg", "-hide_banner", "-encoders")
+        available = encoders is not None and FDK_AAC_ENCODER.encode() in encoders.split()
+        self.audio_encoder = FDK_AAC_ENCODER if available else DEFAULT_AUDIO_ENCODER
+        self._build_command_templates()
+
+        logger.info(f"Using audio encoder: {self.audio_encoder}")
+        return self.audio_encoder
+
+    def _audio_encode_args(self) -> tuple[str, ...]:
+        """Build the re-encoding audio arguments for the selected encoder.
+
+        Returns:
+            tuple[str, ...]: Audio codec arguments
+        """
+        if self.audio_encoder == FDK_AAC_ENCODER:
+            return ("-c:a", FDK_AAC_ENCODER, "-vbr", "3")
+        return ("-c:a", DEFAULT_AUDIO_ENCODER, "-b:a", f"{self.audio_bitrate}k")
+
+    async def prepare_background(self) -> bool:
+        """Pre-decode the background image into a raw YUV420p frame.
+
+        Conversions then read the raw frame instead of decoding and
+        colour-converting the JPEG for every job. Dimensions are rounded down
+        to even values as required by YUV420p.
+
+        Returns:
+            bool: True if the prepared frame is in use, False to keep the original image
+        """
+        if self.audio_only or not self.background_image.exists():
+            return False
+
+        probe = await self._run_tool(
+            "ffprobe",
+            "-v",
+            "error",
+            "-select_streams",
+            "v:0",
+            "-show_entries",
+            "stream=width,height",
+            "-of",
+            "csv=p=0:s=x",
+            str(self.background_image),
+        )
+        if probe is None:
+            return False
+
         try:
-            # Execute FFmpeg command with timeout
-            process = await asyncio.create_subprocess_exec(
-                *command,
+            width, height = (int(value) // 2 * 2 for value in probe.decode().strip().split("x"))
+        except ValueError:
+            logger.warning(f"Could not read background image size: {probe!r}")
+            return False
+
+        raw_path = self.settings.prepared_background
+        result = await self._run_tool(
+            "ffmpeg",
+            "-y",
+            "-v",
+            "error",
+            "-i",
+            str(self.background_image),
+            "-vf",
+            f"scale={width}:{height},format=yuv420p",
+            "-frames:v",
+            "1",
+            "-f",
+            "rawvideo",
+            str(raw_path),
+        )
+        if result is None:
+            return False
+
+        self._prepared_background = (raw_path, f"{width}x{height}")
+        self._build_command_templates()
+        logger.info(f"Prepared raw background frame: {raw_path} ({width}x{height})")
+        return True
+
+    async def _run_tool(self, *args: str) -> bytes | None:
+        """Run a short FFmpeg/FFprobe command.
+
+        Args:
+            *args: Command and arguments
+
+        Returns:
+            Optional[bytes]: stdout on success, None if the command failed
+        """
+        try:
+            process = await self._spawn(
+                *args,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
             )
+        except OSError:
+            return None
 
-            # Monitor process with progress logging
-            stdout, stderr = await self._monitor_process_with_timeout(process, input_audio)
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=30)
+        except asyncio.TimeoutError:
+            await self._kill_process(process)
+            return None
 
-            # Check if process completed successfully
-            if process.returncode != 0:
-                stderr_text = stderr.decode("utf-8", errors="replace")
-                error_msg = f"FFmpeg failed with return code {process.returncode}"
-                logger.error(f"{error_msg}\nStderr: {stderr_text}")
-                raise FFmpegError(error_msg, process.returncode, stderr_text)
+        if process.returncode != 0:
+            logger.debug(f"{args[0]} failed: {stderr.decode('utf-8', errors='replace')}")
+            return None
 
-            # Validate output file was created
-            if not output_video.exists():
-                raise FFmpegError("FFmpeg completed but output file was not created")
+        return stdout
 
-            # Validate output file has content
-            if output_video.stat().st_size == 0:
-                raise FFmpegError("FFmpeg created empty output file")
+    async def _probe_encoder(self, encoder: str) -> bool:
+        """Check if an encoder works on this host.
 
-            logger.info(f"FFmpeg conversion completed successfully: {output_video.name}")
-
-        except asyncio.TimeoutError as e:
-            # Kill the process if it's still running
-            if process.returncode is None:
-                try:
-                    process.kill()
-                    await process.wait()
-                except Exception as cleanup_error:
-                    logger.debug(f"Failed to kill process during cleanup: {cleanup_error}")
+        Args:
+            encoder: FFmpeg video encoder name
 
-            error_msg = f"FFmpeg conversion timed out after {self.timeout} seconds"
-            logger.error(error_msg)
-            raise FFmpegError(error_msg) from e
+        Returns:
+            bool: True if a short test encode succeeds
+        """
+        try:
+            process = await self._spawn(
+                "ffmpeg",
+                "-hide_banner",
+                "-loglevel",
+                "error",
+                "-f",
+                "lavfi",
+                "-i",
+                "color=c=black:s=256x256:d=0.1",
+                "-c:v",
+                encoder,
+                "-f",
+                "null",
+                "-",
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+        except OSError:
+            return False
 
-        except FileNotFoundError as e:
-            error_msg = "FFmpeg executable not found. Please ensure FFmpeg is installed."
-            logger.error(error_msg)
-            raise FFmpegError(error_msg) from e
+        try:
+            await asyncio.wait_for(process.wait(), timeout=10)
+        except asyncio.TimeoutError:
+            await self._kill_process(process)
+            return False
 
-        except Exception as e:
-            error_msg = f"Unexpected error during FFmpeg conversion: {str(e)}"
-            logger.error(error_msg)
-            raise FFmpegError(error_msg) from e
+        return process.returncode == 0
 
     async def validate_ffmpeg_installation(self) -> bool:
         """Check if FFmpeg is properly installed and accessible.
 
+        A successful check is cached, so repeated calls don't spawn a new
+        process. Failures are not cached and are retried on the next call.
+
+        Returns:
+            bool: True if FFmpeg is available, False otherwise
+        """
+        async with self._ffmpeg_lock:
+            if not self._ffmpeg_ok:
+                self._ffmpeg_ok = await self._run_ffmpeg_version()
+            return self._ffmpeg_ok
+
+    async def _run_ffmpeg_version(self) -> bool:
+        """Run `ffmpeg -version` to check that FFmpeg works.
+
         Returns:
             bool: True if FFmpeg is available, False otherwise
         """
         try:
-            process = await asyncio.create_subprocess_exec(
+            process = await self._spawn(
                 "ffmpeg",
                 "-version",
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
             )
 
-            await asyncio.wait_for(process.communicate(), timeout=10)
+            await asyncio.wait_for(process.communicate(), timeout=FFMPEG_VERSION_TIMEOUT)
             return process.returncode == 0
 
         except (asyncio.TimeoutError, FileNotFoundError):
@@ -4,6 +4,7 @@ Provides configuration management with environment variable loading,
 validation, and type-safe settings using dataclass.
 """
 
+import functools
 import os
 from dataclasses import dataclass
 from enum import Enum
@@ -11,6 +12,32 @@ from pathlib import Path
 
 from dotenv import load_dotenv
 
+# Environment variables read by Settings.from_env
+ENV_VARS = (
+    "DISCORD_TOKEN",
+    "CHANNEL_ID",
+    "WORK_DIR",
+    "BACKGROUND_IMAGE",
+    "DELETE_ON_SUCCESS",
+    "AUDIO_ONLY",
+    "AUDIO_BITRATE",
+    "MAX_FILE_SIZE",
+    "PROCESSING_TIMEOUT",
+    "FFMPEG_THREADS",
+    "MAX_CONCURRENT_FFMPEG",
+    "BOT_MODE",
+    "WHISPER_API_URL",
+    "WHISPER_MODEL",
+    "TRANSCRIPTION_OUTPUT_DIR",
+    "MAX_CONCURRENT_TRANSCRIPTIONS",
+)
+
+# Distinct environment snapshots whose parsed Settings are kept
+ENV_SNAPSHOT_CACHE_SIZE = 8
+
+# .env is parsed once per process
+_dotenv_loaded = False
+
 
 class BotMode(Enum):
     """Bot operation mode."""
@@ -19,12 +46,13 @@ class BotMode(Enum):
     TRANSCRIPTION = "transcription"
 
 
-@dataclass
+@dataclass(frozen=True)
 class Settings:
     """Configuration settings for the Discord Voice Diary Bot.
 
     Loads configuration from environment variables with validation
-    and provides sensible defaults where appropriate.
+    and provides sensible defaults where appropriate. Instances are
+    immutable; use dataclasses.replace to derive modified settings.
     """
 
     # Required settings
@@ -38,14 +66,23 @@ class Settings:
     work_dir: Path = Path("/work")
     background_image: Path = Path("/work/assets/bg.jpg")
     delete_on_success: bool = False
+    audio_only: bool = False  # Produce M4A audio instead of MP4 video
     audio_bitrate: int = 96
     max_file_size: int = 25 * 1024 * 1024  # 25MB in bytes
     processing_timeout: int = 3600  # 60 minutes in seconds
+    ffmpeg_threads: int = 2  # Encoder threads (and pinned CPUs) per FFmpeg process, 0 = auto
+    max_concurrent_ffmpeg: int = 2  # FFmpeg processes allowed to run at once
 
     # Whisper API settings (for transcription mode)
     whisper_api_url: str = "http://localhost:8000"
     whisper_model: str = "Systran/faster-whisper-medium"
     transcription_output_dir: Path = Path("/transcriptions")
+    max_concurrent_transcriptions: int = 5  # Whisper requests allowed in flight at once
+
+    @property
+    def prepared_background(self) -> Path:
+        """Path of the background image pre-decoded to a raw YUV420p frame."""
+        return self.work_dir / "assets" / f"{self.background_image.stem}.yuv"
 
     @classmethod
     def from_env(cls) -> "Settings":
@@ -62,15 +99,39 @@ class Settings:
             ValueError: If required environment variables are missing
                        or if audio_bitrate is outside valid range
         """
+        global _dotenv_loaded
+
         # Load environment variables from .env file if present
-        load_dotenv()
+        if not _dotenv_loaded:
+            load_dotenv()
+            _dotenv_loaded = True
+
+        # Settings are only rebuilt when a relevant variable changed; being frozen,
+        # the cached instance is safe to share between callers
+        return cls._from_env_snapshot(tuple(os.environ.get(name) for name in ENV_VARS))
+
+    @classmethod
+    @functools.lru_cache(maxsize=ENV_SNAPSHOT_CACHE_SIZE)
+    def _from_env_snapshot(cls, snapshot: tuple[str | None, ...]) -> "Settings":
+        """Parse and validate settings from a snapshot of ENV_VARS values.
+
+        Args:
+            snapshot: Values of ENV_VARS, in order (None when unset)
+
+        Returns:
+            Settings: Configured settings instance
+
+        Raises:
+            ValueError: If required values are missing or invalid
+        """
+        env = {name: value for name, value in zip(ENV_VARS, snapshot, strict=True) if value is not None}
 
         # Get required settings
-        discord_token = os.getenv("DISCORD_TOKEN")
+        discord_token = env.get("DISCORD_TOKEN")
         if not discord_token:
             raise ValueError("DISCORD_TOKEN environment variable is required")
 
-        channel_id_str = os.getenv("CHANNEL_ID")
+        channel_id_str = env.get("CHANNEL_ID")
         if not channel_id_str:
             raise ValueError("CHANNEL_ID environment variable is required")
 
@@ -80,37 +141,48 @@ class Settings:
             raise ValueError(f"CHANNEL_ID must be a valid integer: {channel_id_str}") from e
 
         # Get optional settings with defaults
-        work_dir = Path(os.getenv("WORK_DIR", "/work"))
-        background_image = Path(os.getenv("BACKGROUND_IMAGE", "/work/assets/bg.jpg"))
+        work_dir = Path(env.get("WORK_DIR", "/work"))
+        background_image = Path(env.get("BACKGROUND_IMAGE", "/work/assets/bg.jpg"))
 
-        delete_on_success = os.getenv("DELETE_ON_SUCCESS", "false").lower() in (
+        delete_on_success = env.get("DELETE_ON_SUCCESS", "false").lower() in (
+            "true",
+            "1",
+            "yes",
+        )
+
+        audio_only = env.get("AUDIO_ONLY", "false").lower() in (
             "true",
             "1",
             "yes",
         )
 
         # Audio bitrate with validation
-        audio_bitrate = int(os.getenv("AUDIO_BITRATE", "96"))
+        audio_bitrate = int(env.get("AUDIO_BITRATE", "96"))
         if not 64 <= audio_bitrate <= 128:
             raise ValueError(f"AUDIO_BITRATE must be between 64 and 128 kbps, got {audio_bitrate}")
 
         # File size limit
-        max_file_size = int(os.getenv("MAX_FILE_SIZE", str(25 * 1024 * 1024)))
+        max_file_size = int(env.get("MAX_FILE_SIZE", str(25 * 1024 * 1024)))
 
         # Processing timeout
-        processing_timeout = int(os.getenv("PROCESSING_TIMEOUT", "3600"))
+        processing_timeout = int(env.get("PROCESSING_TIMEOUT", "3600"))
+
+        # FFmpeg threads per conversion
+        ffmpeg_threads = int(env.get("FFMPEG_THREADS", "2"))
+        max_concurrent_ffmpeg = int(env.get("MAX_CONCURRENT_FFMPEG", "2"))
 
         # Bot mode
-        bot_mode_str = os.getenv("BOT_MODE", "video").lower()
+        bot_mode_str = env.get("BOT_MODE", "video").lower()
         try:
             bot_mode = BotMode(bot_mode_str)
         except ValueError as e:
             raise ValueError(f"BOT_MODE must be 'video' or 'transcription', got '{bot_mode_str}'") from e
 
         # Whisper API settings
-        whisper_api_url = os.getenv("WHISPER_API_URL", "http://localhost:8000")
-        whisper_model = os.getenv("WHISPER_MODEL", "Systran/faster-whisper-medium")
-        transcription_output_dir = Path(os.getenv("TRANSCRIPTION_OUTPUT_DIR", "/transcriptions"))
+        whisper_api_url = env.get("WHISPER_API_URL", "http://localhost:8000")
+        whisper_model = env.get("WHISPER_MODEL", "Systran/faster-whisper-medium")
+        transcription_output_dir = Path(env.get("TRANSCRIPTION_OUTPUT_DIR", "/transcriptions"))
+        max_concurrent_transcriptions = int(env.get("MAX_CONCURRENT_TRANSCRIPTIONS", "5"))
 
         return cls(
             discord_token=discord_token,
@@ -119,23 +191,28 @@ class Settings:
             work_dir=work_dir,
             background_image=background_image,
             delete_on_success=delete_on_success,
+            audio_only=audio_only,
             audio_bitrate=audio_bitrate,
             max_file_size=max_file_size,
             processing_timeout=processing_timeout,
+            ffmpeg_threads=ffmpeg_threads,
+            max_concurrent_ffmpeg=max_concurrent_ffmpeg,
             whisper_api_url=whisper_api_url,
             whisper_model=whisper_model,
             transcription_output_dir=transcription_output_dir,
+            max_concurrent_transcriptions=max_concurrent_transcriptions,
         )
 
     def __post_init__(self) -> None:
         """Validate settings after initialization."""
         # Convert string paths to Path objects if needed
+        # (the dataclass is frozen, so fields are set through object.__setattr__)
         if isinstance(self.work_dir, str):
-            self.work_dir = Path(self.work_dir)
+            object.__setattr__(self, "work_dir", Path(self.work_dir))
         if isinstance(self.background_image, str):
-            self.background_image = Path(self.background_image)
+            object.__setattr__(self, "background_image", Path(self.background_image))
         if isinstance(self.transcription_output_dir, str):
-            self.transcription_output_dir = Path(self.transcription_output_dir)
+            object.__setattr__(self, "transcription_output_dir", Path(self.transcription_output_dir))
 
         # Validate audio bitrate range
         if not 64 <= self.audio_bitrate <= 128:
@@ -147,3 +224,12 @@ class Settings:
 
         if self.processing_timeout <= 0:
             raise ValueError("Processing timeout must be positive")
+
+        if self.ffmpeg_threads < 0:
+            raise ValueError("FFmpeg threads must not be negative")
+
+        if self.max_concurrent_ffmpeg <= 0:
+            raise ValueError("Max concurrent FFmpeg processes must be positive")
+
+        if self.max_concurrent_transcriptions <= 0:
+            raise ValueError("Max concurrent transcriptions must be positive")
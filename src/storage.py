@@ -4,10 +4,18 @@ Provides file management functionality including path generation,
 directory structure management, file cleanup, and file utilities.
 """
 
+import hashlib
+import json
+import os
+import shutil
+import stat
 from pathlib import Path
 
 from .settings import Settings
 
+# Maps audio content hashes to the output already produced for them
+HASH_INDEX_FILENAME = ".hashes.json"
+
 
 class StorageManager:
     """Manages file storage operations for the voice diary bot.
@@ -31,6 +39,9 @@ class StorageManager:
         # Ensure directories exist
         self._ensure_directories()
 
+        self._hash_index_path = self.work_dir / HASH_INDEX_FILENAME
+        self._hash_index = self._load_hash_index()
+
     def _ensure_directories(self) -> None:
         """Create required directories if they don't exist."""
         directories = [self.work_dir, self.inbox_dir, self.output_dir, self.assets_dir]
@@ -50,17 +61,18 @@ class StorageManager:
         return self.inbox_dir / filename
 
     def get_output_path(self, input_filename: str) -> Path:
-        """Generate path for output MP4 video file.
+        """Generate path for output file.
 
         Args:
             input_filename: Original audio filename
 
         Returns:
-            Path: Full path for the output MP4 file
+            Path: Full path for the output MP4 file (M4A in audio-only mode)
         """
-        # Change extension to .mp4
+        # Change extension to .mp4 (or .m4a for audio-only output)
         base_name = Path(input_filename).stem
-        output_filename = f"{base_name}.mp4"
+        extension = ".m4a" if self.settings.audio_only else ".mp4"
+        output_filename = f"{base_name}{extension}"
         return self.output_dir / output_filename
 
     def get_background_image_path(self) -> Path:
@@ -71,6 +83,115 @@ class StorageManager:
         """
         return self.settings.background_image
 
+    def content_hash(self, file_path: Path, conversion: str = "") -> str:
+        """Compute the SHA-256 digest of a file's content.
+
+        Args:
+            file_path: Path to file to hash
+            conversion: Conversion settings hashed ahead of the content, so an
+                output is only reused for uploads converted the same way
+
+        Returns:
+            str: Hex digest
+        """
+        hasher = hashlib.sha256()
+        if conversion:
+            hasher.update(conversion.encode() + b"\0")
+        with open(file_path, "rb") as f:
+            return hashlib.file_digest(f, lambda: hasher).hexdigest()
+
+    def find_output_by_hash(self, digest: str) -> Path | None:
+        """Look up an existing output produced from identical audio.
+
+        Args:
+            digest: Content hash of the input audio
+
+        Returns:
+            Optional[Path]: Existing output file, None if unknown or since removed
+        """
+        output_path = self._hash_index.get(digest)
+        if output_path is None:
+            return None
+
+        if self._stat_file(output_path) is None:
+            del self._hash_index[digest]
+            self._save_hash_index()
+            return None
+
+        return output_path
+
+    def record_output_hash(self, digest: str, output_path: Path) -> None:
+        """Remember the output produced for audio with the given hash.
+
+        Args:
+            digest: Content hash of the input audio
+            output_path: Output file converted from that audio
+        """
+        self._hash_index[digest] = output_path
+        self._save_hash_index()
+
+    def link_output(self, existing_output: Path, output_path: Path) -> None:
+        """Give a duplicate upload its own name for an existing output.
+
+        The output is hard-linked (copied where links aren't supported) so the
+        duplicate keeps its content even if the original path is later reconverted.
+        Hashes recorded for the previous content of output_path are forgotten.
+
+        Args:
+            existing_output: Previously converted output file
+            output_path: Output path for the duplicate upload
+        """
+        if output_path == existing_output:
+            return
+
+        self.release_output_path(output_path)
+        try:
+            os.link(existing_output, output_path)
+        except OSError:
+            shutil.copyfile(existing_output, output_path)
+
+    def release_output_path(self, output_path: Path) -> None:
+        """Prepare an output path to be overwritten by a new conversion.
+
+        Removes the current file so FFmpeg writes a new one instead of
+        truncating content still shared with duplicate uploads, and forgets
+        hashes whose output is about to change.
+
+        Args:
+            output_path: Output path about to be written
+        """
+        output_path.unlink(missing_ok=True)
+
+        stale = [digest for digest, path in self._hash_index.items() if path == output_path]
+        if stale:
+            for digest in stale:
+                del self._hash_index[digest]
+            self._save_hash_index()
+
+    def _load_hash_index(self) -> dict[str, Path]:
+        """Load the persisted content hash index.
+
+        Returns:
+            dict[str, Path]: Content hash to output path, empty if missing or unreadable
+        """
+        try:
+            with open(self._hash_index_path, encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        if not isinstance(entries, dict):
+            return {}
+
+        return {digest: Path(path) for digest, path in entries.items()}
+
+    def _save_hash_index(self) -> None:
+        """Persist the content hash index atomically."""
+        tmp_path = self._hash_index_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({digest: str(path) for digest, path in self._hash_index.items()}, f)
+        os.replace(tmp_path, self._hash_index_path)
+
     def cleanup_inbox_file(self, file_path: Path) -> None:
         """Remove file from inbox directory.
 
@@ -100,10 +221,20 @@ class StorageManager:
             int: Number of files removed
         """
         count = 0
-        for file_path in self.inbox_dir.iterdir():
-            if file_path.is_file():
-                file_path.unlink()
-                count += 1
+        # Unlink relative to the open directory so each removal skips path resolution
+        dir_fd = os.open(self.inbox_dir, os.O_RDONLY) if os.unlink in os.supports_dir_fd else None
+        try:
+            with os.scandir(self.inbox_dir) as entries:
+                for entry in entries:
+                    if entry.is_file(follow_symlinks=False):
+                        if dir_fd is not None:
+                            os.unlink(entry.name, dir_fd=dir_fd)
+                        else:
+                            os.unlink(entry.path)
+                        count += 1
+        finally:
+            if dir_fd is not None:
+                os.close(dir_fd)
         return count
 
     def file_exists(self, file_path: Path) -> bool:
@@ -115,7 +246,7 @@ class StorageManager:
         Returns:
             bool: True if file exists and is a regular file
         """
-        return file_path.exists() and file_path.is_file()
+        return self._stat_file(file_path) is not None
 
     def get_file_size(self, file_path: Path) -> int | None:
         """Get file size in bytes.
@@ -126,10 +257,24 @@ class StorageManager:
         Returns:
             Optional[int]: File size in bytes, None if file doesn't exist
         """
-        if not self.file_exists(file_path):
+        file_stat = self._stat_file(file_path)
+        return file_stat.st_size if file_stat is not None else None
+
+    def _stat_file(self, file_path: Path) -> os.stat_result | None:
+        """Stat a path once, accepting only regular files.
+
+        Args:
+            file_path: Path to stat
+
+        Returns:
+            Optional[os.stat_result]: Stat result, None if missing or not a regular file
+        """
+        try:
+            file_stat = os.stat(file_path)
+        except OSError:
             return None
 
-        return file_path.stat().st_size
+        return file_stat if stat.S_ISREG(file_stat.st_mode) else None
 
     def validate_file_size(self, file_path: Path) -> bool:
         """Validate that file size is within limits.
@@ -161,25 +306,59 @@ class StorageManager:
             ("assets", self.assets_dir),
         ]:
             if directory.exists():
-                total_size = sum(
-                    f.stat().st_size for f in directory.rglob("*") if f.is_file()
-                )
-                usage[name] = total_size
+                usage[name] = self._directory_size(directory)
             else:
                 usage[name] = 0
 
         return usage
 
+    def _directory_size(self, directory: Path) -> int:
+        """Sum sizes of all regular files below a directory.
+
+        Uses os.scandir so file type and size come from the directory entry
+        without creating Path objects or extra stat calls per file.
+
+        Args:
+            directory: Directory to walk
+
+        Returns:
+            int: Total size in bytes
+        """
+        total = 0
+        pending = [os.fspath(directory)]
+
+        while pending:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_file(follow_symlinks=False):
+                        total += entry.stat(follow_symlinks=False).st_size
+                    elif entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+
+        return total
+
+    def _list_files(self, directory: Path) -> list[Path]:
+        """List regular files directly inside a directory.
+
+        Args:
+            directory: Directory to list
+
+        Returns:
+            list[Path]: List of file paths
+        """
+        if not directory.exists():
+            return []
+
+        with os.scandir(directory) as entries:
+            return [Path(entry.path) for entry in entries if entry.is_file()]
+
     def list_inbox_files(self) -> list[Path]:
         """List all files in inbox directory.
 
         Returns:
             list[Path]: List of file paths in inbox
         """
-        if not self.inbox_dir.exists():
-            return []
-
-        return [f for f in self.inbox_dir.iterdir() if f.is_file()]
+        return self._list_files(self.inbox_dir)
 
     def list_output_files(self) -> list[Path]:
         """List all files in output directory.
@@ -187,7 +366,4 @@ class StorageManager:
         Returns:
             list[Path]: List of file paths in output
         """
-        if not self.output_dir.exists():
-            return []
-
-        return [f for f in self.output_dir.iterdir() if f.is_file()]
+        return self._list_files(self.output_dir)
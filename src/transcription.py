@@ -3,9 +3,17 @@
 Handles audio transcription using Whisper API and markdown file generation.
 """
 
+import asyncio
+import calendar
+import contextlib
+import functools
 import logging
+import os
+import random
+import ssl
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Any, NamedTuple
 
 import aiohttp
 
@@ -13,6 +21,118 @@ from .settings import Settings
 
 logger = logging.getLogger(__name__)
 
+_ONE_DAY = timedelta(days=1)
+
+# Whisper API responses worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+WHISPER_MAX_ATTEMPTS = 5
+WHISPER_MAX_BACKOFF = 30.0  # seconds
+
+# The Whisper endpoint is a single fixed host; keep its address cached between requests
+WHISPER_DNS_CACHE_TTL = 600  # seconds
+
+# Most queued daily note entries written in one batch
+MAX_COALESCED_WRITES = 64
+
+# Bytes of an error response body kept for logging
+ERROR_BODY_LIMIT = 512
+
+
+class WhisperError(aiohttp.ClientError):
+    """Exception raised when the Whisper API returns an error status."""
+
+    def __init__(self, status: int, body: bytes) -> None:
+        super().__init__(f"Whisper API returned {status}: {body.decode('utf-8', errors='replace')}")
+        self.status = status
+        self.body = body
+
+
+def _iso_weeks_in_year(iso_year: int) -> int:
+    """Count the ISO weeks in an ISO year.
+
+    A year has 53 weeks when it starts on a Thursday, or on a Wednesday in a leap year.
+
+    Args:
+        iso_year: ISO calendar year
+
+    Returns:
+        int: 52 or 53
+    """
+    jan1 = datetime(iso_year, 1, 1).isoweekday()
+    return 53 if jan1 == 4 or (jan1 == 3 and calendar.isleap(iso_year)) else 52
+
+
+@functools.lru_cache(maxsize=8)
+def _daily_template_for_date(date_ordinal: int) -> str:
+    """Build the Obsidian Daily note template header for a date.
+
+    Cached by date, since every note created on the same day gets the same header.
+
+    Args:
+        date_ordinal: Proleptic Gregorian ordinal of the note date
+
+    Returns:
+        str: Formatted template header with front matter, breadcrumb, week nav, and week days
+    """
+    date = datetime.fromordinal(date_ordinal)
+
+    # === Front Matter ===
+    front_matter = "---\ntags:\n  - 日記\n---\n\n"
+
+    # === Breadcrumb ===
+    year = date.year
+    quarter = (date.month - 1) // 3 + 1
+    breadcrumb = f"[[{year}]] / [[{year}-Q{quarter}|Q{quarter}]] / [[{year}-{date.month:02d}|{date.month}月]]"
+
+    # === ISO Week ===
+    iso_year, iso_week, _ = date.isocalendar()
+    prev_year, prev_week = (iso_year, iso_week - 1) if iso_week > 1 else (iso_year - 1, _iso_weeks_in_year(iso_year - 1))
+    next_year, next_week = (iso_year, iso_week + 1) if iso_week < _iso_weeks_in_year(iso_year) else (iso_year + 1, 1)
+
+    def week_link(year: int, week: int) -> str:
+        return f"[[{year}-W{week:02d}|Week {week}]]"
+
+    week_nav = f"❮ {week_link(prev_year, prev_week)} | Week {iso_week} | {week_link(next_year, next_week)} ❯"
+
+    # === Same week day links (Monday start) ===
+    day = date - timedelta(days=date.isoweekday() - 1)
+    days = []
+    for _ in range(7):
+        days.append(f"[[{day.year:04d}-{day.month:02d}-{day.day:02d}|{day.day:02d}]]")
+        day += _ONE_DAY
+    week_days = " - ".join(days)
+
+    return f"{front_matter}{breadcrumb}\n{week_nav}\n{week_days}\n\n"
+
+
+def _write_all(fd: int, chunks: list[bytes]) -> None:
+    """Write byte chunks to a file descriptor, gathered into a single writev where available.
+
+    Args:
+        fd: Open file descriptor
+        chunks: Byte strings to write, in order
+
+    Raises:
+        OSError: If the write fails
+    """
+    written = os.writev(fd, chunks) if hasattr(os, "writev") else 0
+    if written == sum(map(len, chunks)):
+        return
+
+    # Short write (or no writev): finish with plain writes
+    remaining = memoryview(b"".join(chunks))[written:]
+    while remaining:
+        remaining = remaining[os.write(fd, remaining) :]
+
+
+class _NoteWrite(NamedTuple):
+    """Transcript entry waiting to be appended to a daily note."""
+
+    markdown_path: Path
+    now: datetime
+    entry: bytes
+    written: asyncio.Future[None]
+
 
 class TranscriptionHandler:
     """Handler for audio transcription operations.
@@ -27,8 +147,64 @@ class TranscriptionHandler:
             settings: Application settings
         """
         self.settings = settings
+
+        # Per-request values derived from settings, computed once
+        self._api_url = f"{settings.whisper_api_url}/v1/audio/transcriptions"
+        # One TLS context for the handler's lifetime, shared by every recreated session
+        self._ssl_context = ssl.create_default_context() if self._api_url.startswith("https://") else None
+        # Plain JSON carries only the text, never per-segment details
+        self._form_fields = (("model", settings.whisper_model), ("response_format", "json"))
+        self._output_dir = settings.transcription_output_dir
+
+        self._session: aiohttp.ClientSession | None = None
+        self._semaphore = asyncio.Semaphore(settings.max_concurrent_transcriptions)
+
+        # Note writes go through a single writer task that coalesces queued entries
+        self._write_queue: asyncio.Queue[_NoteWrite] = asyncio.Queue()
+        self._writer_task: asyncio.Task[None] | None = None
         logger.info("TranscriptionHandler initialized")
 
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared Whisper API session, creating it if needed.
+
+        Returns:
+            aiohttp.ClientSession: Pooled session kept alive between transcriptions
+        """
+        if self._session is None or self._session.closed:
+            # Configure timeout for long audio files (up to 30 minutes)
+            timeout = aiohttp.ClientTimeout(total=1800)  # 30 minutes
+            connector = aiohttp.TCPConnector(
+                limit=20,
+                keepalive_timeout=60,
+                ttl_dns_cache=WHISPER_DNS_CACHE_TTL,
+                ssl=self._ssl_context if self._ssl_context is not None else True,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self._session
+
+    async def close(self) -> None:
+        """Stop the note writer and close the shared Whisper API session.
+
+        Entries already queued are written before the writer stops, so pending
+        save_to_markdown calls complete instead of waiting forever.
+        """
+        writer_task, self._writer_task = self._writer_task, None
+        if writer_task is not None:
+            if not writer_task.done():
+                await self._write_queue.join()
+            writer_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await writer_task
+
+        # Nothing is left to write entries queued after the writer stopped
+        while not self._write_queue.empty():
+            item = self._write_queue.get_nowait()
+            self._write_queue.task_done()
+            if not item.written.done():
+                item.written.set_exception(RuntimeError("TranscriptionHandler closed before the note was written"))
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
     async def transcribe_audio(self, audio_path: Path) -> str:
         """Transcribe audio file using Whisper API.
 
@@ -44,41 +220,19 @@ class TranscriptionHandler:
         """
         logger.info(f"Transcribing audio with Whisper API: {audio_path}")
 
-        # Construct API endpoint
-        api_url = f"{self.settings.whisper_api_url}/v1/audio/transcriptions"
-
         try:
-            # Read audio file content
-            with open(audio_path, "rb") as audio_file:
-                audio_content = audio_file.read()
-
-            # Configure timeout for long audio files (up to 30 minutes)
-            timeout = aiohttp.ClientTimeout(total=1800)  # 30 minutes
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                # Prepare multipart form data
-                data = aiohttp.FormData()
+            result = await self._post_with_retry(audio_path)
 
-                # Add audio file with content
-                data.add_field("file", audio_content, filename=audio_path.name, content_type="application/octet-stream")
+            # Extract text from response
+            if "text" not in result:
+                raise ValueError(f"Invalid Whisper API response: {result}")
 
-                # Add model parameter
-                data.add_field("model", self.settings.whisper_model)
+            transcribed_text = result["text"]
+            if not isinstance(transcribed_text, str):
+                raise ValueError(f"Expected text to be str, got {type(transcribed_text)}")
 
-                # Send request
-                async with session.post(api_url, data=data) as response:
-                    response.raise_for_status()
-                    result = await response.json()
-
-                    # Extract text from response
-                    if "text" not in result:
-                        raise ValueError(f"Invalid Whisper API response: {result}")
-
-                    transcribed_text = result["text"]
-                    if not isinstance(transcribed_text, str):
-                        raise ValueError(f"Expected text to be str, got {type(transcribed_text)}")
-
-                    logger.info(f"Transcription complete: {len(transcribed_text)} characters")
-                    return transcribed_text
+            logger.info(f"Transcription complete: {len(transcribed_text)} characters")
+            return transcribed_text
 
         except aiohttp.ClientError as e:
             logger.error(f"Whisper API request failed: {e}")
@@ -87,41 +241,82 @@ class TranscriptionHandler:
             logger.error(f"Unexpected error during transcription: {e}")
             raise
 
-    def _generate_daily_template(self, date: datetime) -> str:
-        """Generate Obsidian Daily note template header.
+    async def _post_with_retry(self, audio_path: Path) -> Any:
+        """POST audio to the Whisper API, retrying rate-limit and server errors.
+
+        Retries reuse the pooled session and back off exponentially with jitter,
+        honoring Retry-After when the server sends one.
 
         Args:
-            date: Date for the daily note
+            audio_path: Path to audio file, reopened for each attempt
 
         Returns:
-            str: Formatted template header with front matter, breadcrumb, week nav, and week days
+            Any: Decoded JSON response
+
+        Raises:
+            WhisperError: If the final attempt returns an error status
         """
-        # === Front Matter ===
-        front_matter = "---\ntags:\n  - 日記\n---\n\n"
+        session = self._get_session()
+
+        attempt = 1
+        while True:
+            # Open without blocking the event loop; aiohttp streams the file in chunks
+            # from a worker thread instead of buffering it in memory. Each attempt gets
+            # a fresh file object rather than relying on aiohttp re-sending a used payload.
+            with await asyncio.to_thread(open, audio_path, "rb") as audio_file:
+                # Build the multipart body directly; only the file part changes per request
+                data = aiohttp.MultipartWriter("form-data")
+
+                # Add audio file as a streamed payload
+                file_part = data.append(audio_file, {"Content-Type": "application/octet-stream"})
+                file_part.set_content_disposition("form-data", name="file", filename=audio_path.name)
+
+                # Add model and response format parameters
+                for name, value in self._form_fields:
+                    data.append(value).set_content_disposition("form-data", name=name)
 
-        # === Breadcrumb ===
-        year = date.year
-        quarter = (date.month - 1) // 3 + 1
-        breadcrumb = f"[[{year}]] / [[{year}-Q{quarter}|Q{quarter}]] / [[{date.strftime('%Y-%m')}|{date.month}月]]"
+                # Send request
+                async with session.post(self._api_url, data=data) as response:
+                    if response.status < 400:
+                        return await response.json()
+
+                    if response.status not in RETRYABLE_STATUSES or attempt == WHISPER_MAX_ATTEMPTS:
+                        # Error bodies may be HTML; keep a prefix for context instead of decoding JSON
+                        body = await response.read()
+                        raise WhisperError(response.status, body[:ERROR_BODY_LIMIT])
+
+                    delay = self._retry_delay(attempt, response.headers.get("Retry-After"))
+                    logger.warning(
+                        f"Whisper API returned {response.status}, retrying in {delay:.1f}s (attempt {attempt}/{WHISPER_MAX_ATTEMPTS})"
+                    )
+
+            await asyncio.sleep(delay)
+            attempt += 1
 
-        # === ISO Week ===
-        _, iso_week, _ = date.isocalendar()
-        prev_week = (date - timedelta(weeks=1)).isocalendar()
-        next_week = (date + timedelta(weeks=1)).isocalendar()
+    def _retry_delay(self, attempt: int, retry_after: str | None) -> float:
+        """Compute the wait before the next Whisper API attempt.
 
-        def week_link(year: int, week: int) -> str:
-            return f"[[{year}-W{week:02d}|Week {week}]]"
+        Args:
+            attempt: Number of the attempt that just failed (1-based)
+            retry_after: Retry-After header value, if any
+
+        Returns:
+            float: Delay in seconds
+        """
+        if retry_after is not None and retry_after.isdigit():
+            return min(WHISPER_MAX_BACKOFF, float(retry_after))
+        return min(WHISPER_MAX_BACKOFF, 0.5 * 2.0 ** (attempt - 1)) + random.random()  # noqa: S311
 
-        week_nav = f"❮ {week_link(prev_week[0], prev_week[1])} | Week {iso_week} | {week_link(next_week[0], next_week[1])} ❯"
+    def _generate_daily_template(self, date: datetime) -> str:
+        """Generate Obsidian Daily note template header.
 
-        # === Same week day links (Monday start) ===
-        start_of_week = date - timedelta(days=date.isoweekday() - 1)
-        days = [
-            f"[[{(start_of_week + timedelta(days=i)).strftime('%Y-%m-%d')}|{(start_of_week + timedelta(days=i)).strftime('%d')}]]" for i in range(7)
-        ]
-        week_days = " - ".join(days)
+        Args:
+            date: Date for the daily note
 
-        return f"{front_matter}{breadcrumb}\n{week_nav}\n{week_days}\n\n"
+        Returns:
+            str: Formatted template header with front matter, breadcrumb, week nav, and week days
+        """
+        return _daily_template_for_date(date.toordinal())
 
     async def save_to_markdown(self, filename: str, transcript: str) -> Path:
         """Save transcript to markdown file.
@@ -144,32 +339,19 @@ class TranscriptionHandler:
         # Get current date for filename
         now = datetime.now()
         markdown_filename = now.strftime("%Y-%m-%d.md")
-        output_dir = self.settings.transcription_output_dir
-        markdown_path = output_dir / markdown_filename
+        markdown_path = self._output_dir / markdown_filename
 
-        # Ensure output directory exists
-        output_dir.mkdir(parents=True, exist_ok=True)
+        # Silent audio yields no text; leave the daily note untouched
+        if not transcript.strip():
+            logger.info(f"Empty transcript for {filename}, skipping write")
+            return markdown_path
 
-        # Check if file exists
-        file_exists = markdown_path.exists()
+        # Prepare transcript entry
+        timestamp = now.strftime("%H:%M:%S")
+        transcript_entry = f"\n## {timestamp} - {filename}\n\n{transcript}\n".encode()
 
         try:
-            # Prepare transcript entry
-            timestamp = now.strftime("%H:%M:%S")
-            transcript_entry = f"\n## {timestamp} - {filename}\n\n{transcript}\n"
-
-            # Open file in append mode
-            with open(markdown_path, "a", encoding="utf-8") as f:
-                # If new file, write template header first
-                if not file_exists:
-                    logger.info(f"Creating new daily note: {markdown_path}")
-                    template_header = self._generate_daily_template(now)
-                    f.write(template_header)
-                else:
-                    logger.info(f"Appending to existing daily note: {markdown_path}")
-
-                # Write transcript entry
-                f.write(transcript_entry)
+            await self._queue_note_write(markdown_path, now, transcript_entry)
 
             logger.info(f"Transcript saved successfully to: {markdown_path}")
             return markdown_path
@@ -178,6 +360,89 @@ class TranscriptionHandler:
             logger.error(f"Failed to save transcript to {markdown_path}: {e}")
             raise
 
+    async def _queue_note_write(self, markdown_path: Path, now: datetime, entry: bytes) -> None:
+        """Queue a daily note entry and wait until it has been written.
+
+        Args:
+            markdown_path: Daily note path
+            now: Time of the entry
+            entry: Formatted transcript entry, UTF-8 encoded
+
+        Raises:
+            OSError: If file operations fail
+        """
+        if self._writer_task is None or self._writer_task.done():
+            self._writer_task = asyncio.create_task(self._note_writer())
+
+        written: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        await self._write_queue.put(_NoteWrite(markdown_path, now, entry, written))
+        await written
+
+    async def _note_writer(self) -> None:
+        """Write queued note entries, one open/append per daily note per batch.
+
+        Entries queued while a write is in progress are grouped by note and
+        written together; file I/O runs in a worker thread so it doesn't
+        block the event loop. Being the only writer also guarantees a new
+        note gets exactly one header.
+        """
+        while True:
+            batch = [await self._write_queue.get()]
+            while len(batch) < MAX_COALESCED_WRITES and not self._write_queue.empty():
+                batch.append(self._write_queue.get_nowait())
+
+            notes: dict[Path, list[_NoteWrite]] = {}
+            for item in batch:
+                notes.setdefault(item.markdown_path, []).append(item)
+
+            for markdown_path, items in notes.items():
+                try:
+                    await asyncio.to_thread(self._write_markdown, markdown_path, items[0].now, b"".join(item.entry for item in items))
+                except Exception as e:
+                    for item in items:
+                        if not item.written.done():
+                            item.written.set_exception(e)
+                else:
+                    for item in items:
+                        if not item.written.done():
+                            item.written.set_result(None)
+
+            for _ in batch:
+                self._write_queue.task_done()
+
+    def _write_markdown(self, markdown_path: Path, now: datetime, transcript_entries: bytes) -> None:
+        """Append transcript entries to a daily note, creating it if needed.
+
+        Args:
+            markdown_path: Daily note path
+            now: Time of the first entry, used for a new note's header
+            transcript_entries: Formatted transcript entries, UTF-8 encoded
+
+        Raises:
+            OSError: If file operations fail
+        """
+        # Create-or-append in one open; an empty file means the note is new
+        flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND
+        try:
+            fd = os.open(markdown_path, flags, 0o644)
+        except FileNotFoundError:
+            # Output directory is only created when missing
+            markdown_path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(markdown_path, flags, 0o644)
+        try:
+            chunks = [transcript_entries]
+
+            # If new file, write template header first
+            if os.fstat(fd).st_size == 0:
+                logger.info(f"Creating new daily note: {markdown_path}")
+                chunks.insert(0, self._generate_daily_template(now).encode())
+            else:
+                logger.info(f"Appending to existing daily note: {markdown_path}")
+
+            _write_all(fd, chunks)
+        finally:
+            os.close(fd)
+
     async def process_transcription(self, audio_path: Path, original_filename: str) -> Path:
         """Complete transcription workflow.
 
@@ -193,11 +458,26 @@ class TranscriptionHandler:
         """
         logger.info(f"Starting transcription workflow for: {original_filename}")
 
-        # Step 1: Transcribe audio
-        transcript = await self.transcribe_audio(audio_path)
+        # Step 1: Transcribe audio, limiting how many Whisper requests run at once
+        async with self._semaphore:
+            transcript = await self.transcribe_audio(audio_path)
 
-        # Step 2: Save to markdown
+        # Step 2: Save to markdown; the slot is already free for the next transcription
         markdown_path = await self.save_to_markdown(original_filename, transcript)
 
         logger.info(f"Transcription workflow complete: {markdown_path}")
         return markdown_path
+
+    async def process_many(self, jobs: list[tuple[Path, str]]) -> list[Path | BaseException]:
+        """Run several transcription workflows concurrently.
+
+        At most max_concurrent_transcriptions Whisper requests run at the same
+        time; saving one transcript overlaps with the next transcription.
+
+        Args:
+            jobs: (audio_path, original_filename) pairs
+
+        Returns:
+            list[Path | BaseException]: Markdown path or raised exception for each job, in order
+        """
+        return await asyncio.gather(*(self.process_transcription(audio_path, name) for audio_path, name in jobs), return_exceptions=True)
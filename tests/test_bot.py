@@ -0,0 +1,187 @@
+"""Tests for bot module."""
+
+import contextlib
+from collections.abc import AsyncIterator, Awaitable
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from src.bot import MSG_AUDIO_SUCCESS, MSG_PROCESSING_BATCH, MSG_PROCESSING_ERROR, MSG_VIDEO_SUCCESS, VoiceDiaryBot
+from src.settings import Settings
+
+CHANNEL_ID = 123456789
+MAX_FILE_SIZE = 1024
+
+
+class _FakeDownload:
+    """Minimal stand-in for an aiohttp response streaming an attachment."""
+
+    def __init__(self, chunks: list[bytes], content_length: int | None) -> None:
+        self.chunks = chunks
+        self.content_length = content_length
+        self.content = self
+
+    def raise_for_status(self) -> None:
+        return None
+
+    async def iter_chunked(self, size: int) -> AsyncIterator[bytes]:
+        for chunk in self.chunks:
+            yield chunk
+
+
+class _FakeHTTP:
+    """Minimal stand-in for the bot's aiohttp session, serving the same body for every URL."""
+
+    closed = False
+
+    def __init__(self, chunks: list[bytes], content_length: int | None = None) -> None:
+        self.chunks = chunks
+        self.content_length = content_length
+        self.get_count = 0
+
+    @contextlib.asynccontextmanager
+    async def get(self, url: str) -> AsyncIterator[_FakeDownload]:
+        self.get_count += 1
+        yield _FakeDownload(self.chunks, self.content_length)
+
+
+def _attachment(filename: str, size: int = 16) -> SimpleNamespace:
+    """Return a Discord attachment stand-in."""
+    return SimpleNamespace(filename=filename, size=size, content_type="audio/ogg", url=f"https://cdn.example/{filename}")
+
+
+async def _fake_convert(input_audio: Path, output_video: Path) -> None:
+    """Stand in for FFmpeg, writing an output derived from the input bytes."""
+    output_video.write_bytes(b"video of " + input_audio.read_bytes())
+
+
+def _upload(bot: VoiceDiaryBot, filename: str, content: bytes) -> Awaitable[str]:
+    """Process an upload of the given content through video mode."""
+    bot._http = _FakeHTTP([content])
+    return bot._process_video_mode(_message(), _attachment(filename))
+
+
+def _message(*attachments: SimpleNamespace) -> Mock:
+    """Return a message in the monitored channel whose replies can be edited."""
+    message = Mock()
+    message.author = "user"
+    message.channel.id = CHANNEL_ID
+    message.attachments = list(attachments)
+    message.reply = AsyncMock(return_value=Mock(edit=AsyncMock()))
+    return message
+
+
+class TestVoiceDiaryBot:
+    """Test cases for VoiceDiaryBot message handling."""
+
+    @pytest.fixture
+    def settings(self, request: pytest.FixtureRequest, temp_dir: Path) -> Settings:
+        """Create bot settings; tests override fields by parametrizing this fixture indirectly."""
+        fields = {
+            "discord_token": "test_token",
+            "channel_id": CHANNEL_ID,
+            "work_dir": temp_dir,
+            "background_image": temp_dir / "assets" / "bg.jpg",
+            "max_file_size": MAX_FILE_SIZE,
+        }
+        return Settings(**(fields | getattr(request, "param", {})))
+
+    @pytest.fixture
+    def bot(self, settings: Settings) -> VoiceDiaryBot:
+        """Create the bot without connecting to Discord."""
+        return VoiceDiaryBot(settings)
+
+    @pytest.mark.parametrize(
+        ("settings", "template", "output_name"),
+        [({}, MSG_VIDEO_SUCCESS, "voice.mp4"), ({"audio_only": True}, MSG_AUDIO_SUCCESS, "voice.m4a")],
+        indirect=["settings"],
+    )
+    async def test_success_reply_matches_output(self, bot: VoiceDiaryBot, template: str, output_name: str) -> None:
+        """Test the success reply names the produced output and says video or audio accordingly."""
+        bot._http = _FakeHTTP([b"audio"])
+        message = _message()
+
+        with patch.object(bot.ffmpeg, "convert_stream_to_video", AsyncMock()) as convert:
+            result = await bot._process_video_mode(message, _attachment("voice.ogg"))
+
+        assert result == template.format("voice.ogg", output_name)
+        assert convert.call_args.args[2] == bot.storage.output_dir / output_name
+        message.reply.return_value.edit.assert_awaited_once_with(content=result)
+
+    async def test_duplicate_upload_survives_reupload_of_original_name(self, bot: VoiceDiaryBot) -> None:
+        """Test a duplicate reuses the first output and keeps it when the original name is reconverted."""
+        with patch.object(bot.ffmpeg, "convert_audio_to_video", AsyncMock(side_effect=_fake_convert)) as convert:
+            await _upload(bot, "first.m4a", b"recording 1")
+            await _upload(bot, "second.m4a", b"recording 1")
+            assert convert.await_count == 1
+
+            await _upload(bot, "first.m4a", b"recording 2")
+            assert convert.await_count == 2
+
+        output_dir = bot.storage.output_dir
+        assert not (output_dir / "second.mp4").is_symlink()
+        assert (output_dir / "second.mp4").read_bytes() == b"video of recording 1"
+        assert (output_dir / "first.mp4").read_bytes() == b"video of recording 2"
+        assert bot.storage.list_inbox_files() == []
+
+    async def test_duplicate_upload_forgets_replaced_output(self, bot: VoiceDiaryBot) -> None:
+        """Test a duplicate linked over an existing output stops serving that output's old content."""
+        with patch.object(bot.ffmpeg, "convert_audio_to_video", AsyncMock(side_effect=_fake_convert)) as convert:
+            await _upload(bot, "a.m4a", b"recording X")
+            await _upload(bot, "b.m4a", b"recording Y")
+            await _upload(bot, "b.m4a", b"recording X")
+            await _upload(bot, "c.m4a", b"recording Y")
+
+        assert convert.await_count == 3
+        output_dir = bot.storage.output_dir
+        assert (output_dir / "b.mp4").read_bytes() == b"video of recording X"
+        assert (output_dir / "c.mp4").read_bytes() == b"video of recording Y"
+
+    async def test_duplicate_upload_reconverted_after_settings_change(self, bot: VoiceDiaryBot) -> None:
+        """Test an output is not reused once the conversion settings differ."""
+        with patch.object(bot.ffmpeg, "convert_audio_to_video", AsyncMock(side_effect=_fake_convert)) as convert:
+            await _upload(bot, "first.m4a", b"recording")
+            bot.ffmpeg.video_encoder = "h264_nvenc"
+            await _upload(bot, "second.m4a", b"recording")
+
+        assert convert.await_count == 2
+
+    @pytest.mark.parametrize(
+        ("declared_size", "content_length", "chunks", "expected_gets"),
+        [
+            (MAX_FILE_SIZE + 1, None, [b"x"], 0),  # Rejected from attachment metadata, before any request
+            (16, MAX_FILE_SIZE + 1, [b"x"], 1),  # Rejected from the response's Content-Length
+            (16, None, [b"x" * 600, b"x" * 600], 1),  # Rejected while streaming
+        ],
+    )
+    async def test_iter_attachment_enforces_size_limit(
+        self, bot: VoiceDiaryBot, declared_size: int, content_length: int | None, chunks: list[bytes], expected_gets: int
+    ) -> None:
+        """Test oversized attachments are rejected however their size becomes known."""
+        http = _FakeHTTP(chunks, content_length)
+        bot._http = http
+
+        with pytest.raises(ValueError, match="exceeds size limit"):
+            async for _ in bot._iter_attachment(_attachment("voice.ogg", size=declared_size)):
+                pass
+
+        assert http.get_count == expected_gets
+
+    async def test_multiple_attachments_share_one_summary(self, bot: VoiceDiaryBot) -> None:
+        """Test several attachments get one status reply, edited once with every result."""
+
+        async def handle(message: Mock, attachment: SimpleNamespace, status_msg: Mock | None) -> str:
+            assert status_msg is not None
+            if attachment.filename == "b.ogg":
+                raise RuntimeError("boom")
+            return f"✅ {attachment.filename}"
+
+        bot._mode_handler = handle
+        message = _message(_attachment("a.ogg"), _attachment("b.ogg"))
+
+        await bot.on_message(message)
+
+        message.reply.assert_awaited_once_with(MSG_PROCESSING_BATCH.format(2))
+        message.reply.return_value.edit.assert_awaited_once_with(content="✅ a.ogg\n" + MSG_PROCESSING_ERROR.format("b.ogg"))
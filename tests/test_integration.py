@@ -1,7 +1,11 @@
 """Integration tests for Discord Voice Diary Bot."""
 
+import asyncio
+import os
+import shutil
+import tempfile
 from pathlib import Path
-from unittest.mock import AsyncMock, patch
+from unittest.mock import patch
 
 import pytest
 
@@ -10,47 +14,130 @@ from src.settings import Settings
 from src.storage import StorageManager
 
 
+def _stderr_reader(data: bytes) -> asyncio.StreamReader:
+    """Return a stream reader holding data, standing in for a finished process's stderr."""
+    reader = asyncio.StreamReader()
+    reader.feed_data(data)
+    reader.feed_eof()
+    return reader
+
+
+class _FakeProcess:
+    """Minimal stand-in for an asyncio FFmpeg subprocess."""
+
+    # No such process, so CPU pinning fails harmlessly
+    pid = -1
+    stdin = None
+    stderr: asyncio.StreamReader | None = None
+
+    def __init__(self, returncode: int = 0, output: tuple[bytes, bytes] = (b"success", b"")) -> None:
+        self.returncode = returncode
+        self.output = output
+
+    async def wait(self) -> int:
+        return self.returncode
+
+    async def communicate(self, input_data: bytes | None = None) -> tuple[bytes, bytes]:
+        return self.output
+
+    def kill(self) -> None:
+        pass
+
+
+def _fastwrite(path: Path, data: bytes) -> None:
+    """Write a small file with a single os.write, skipping the buffered file object."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+
+
+def _materialize(source: Path, destination: Path) -> None:
+    """Hardlink a shared sample file into a test directory, copying across filesystems."""
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
+@pytest.fixture(scope="session")
+def session_sample_blobs(temp_base, sample_audio_content, sample_background_image):
+    """Write the sample audio and background image once per session."""
+    # Same filesystem as temp_dir, so per-test copies can be hardlinks
+    with tempfile.TemporaryDirectory(dir=temp_base) as tmp_dir:
+        blob_dir = Path(tmp_dir)
+
+        audio_blob = blob_dir / "audio.m4a"
+        _fastwrite(audio_blob, sample_audio_content)
+
+        background_blob = blob_dir / "bg.jpg"
+        _fastwrite(background_blob, sample_background_image)
+
+        yield audio_blob, background_blob
+
+
 class TestEndToEndWorkflow:
     """Integration tests for complete file processing workflow."""
 
     @pytest.fixture
-    def integration_settings(self, temp_dir):
-        """Create settings for integration testing."""
-        settings = Settings(
-            discord_token="test_token",
-            channel_id=123456789,
-            work_dir=temp_dir,
-            background_image=temp_dir / "assets" / "bg.jpg",
-            delete_on_success=False,
-            audio_bitrate=96,
-            max_file_size=25 * 1024 * 1024,
-            processing_timeout=300,
-        )
-        return settings
+    def integration_settings(self, request, temp_dir):
+        """Create settings for integration testing.
+
+        Settings are immutable; tests override fields by parametrizing this
+        fixture indirectly with a dict of field values.
+        """
+        fields = {
+            "discord_token": "test_token",
+            "channel_id": 123456789,
+            "work_dir": temp_dir,
+            "background_image": temp_dir / "assets" / "bg.jpg",
+            "delete_on_success": False,
+            "audio_bitrate": 96,
+            "max_file_size": 25 * 1024 * 1024,
+            "processing_timeout": 300,
+        }
+        return Settings(**(fields | getattr(request, "param", {})))
+
+    @pytest.fixture
+    def ffmpeg_process(self):
+        """Patch subprocess creation once per test and return the fake FFmpeg process.
+
+        Tests adjust returncode, stderr and output on the returned process.
+        """
+        process = _FakeProcess()
+
+        async def create_subprocess_exec(*args, **kwargs):
+            return process
+
+        with patch("asyncio.create_subprocess_exec", create_subprocess_exec):
+            yield process
+
+    @pytest.fixture
+    def storage(self, integration_settings):
+        """Create the storage manager, laying out the work directories once per test."""
+        return StorageManager(integration_settings)
 
     @pytest.fixture
-    def setup_integration_env(
-        self, integration_settings, sample_audio_content, sample_background_image
-    ):
+    def setup_integration_env(self, integration_settings, storage, session_sample_blobs):
         """Set up complete integration testing environment."""
-        storage = StorageManager(integration_settings)
+        audio_blob, background_blob = session_sample_blobs
+
         ffmpeg_runner = FFmpegRunner(integration_settings)
 
-        # Create background image
-        background_path = integration_settings.background_image
-        background_path.write_bytes(sample_background_image)
+        # Link background image
+        _materialize(background_blob, integration_settings.background_image)
 
-        # Create test audio file in inbox
+        # Link test audio file into inbox
         audio_filename = "test_audio.m4a"
         input_path = storage.get_inbox_path(audio_filename)
-        input_path.write_bytes(sample_audio_content)
+        _materialize(audio_blob, input_path)
 
         output_path = storage.get_output_path(audio_filename)
 
         return storage, ffmpeg_runner, input_path, output_path
 
-    @pytest.mark.asyncio
-    async def test_complete_audio_processing_workflow(self, setup_integration_env):
+    async def test_complete_audio_processing_workflow(self, setup_integration_env, ffmpeg_process):
         """Test the complete workflow from audio input to video output."""
         storage, ffmpeg_runner, input_path, output_path = setup_integration_env
 
@@ -60,106 +147,81 @@ class TestEndToEndWorkflow:
         assert storage.file_exists(input_path)
         assert storage.validate_file_size(input_path)
 
-        # Mock FFmpeg execution to simulate successful conversion
-        mock_process = AsyncMock()
-        mock_process.returncode = 0
-        mock_process.communicate.return_value = (b"success", b"")
+        # Simulate FFmpeg creating output file
+        _fastwrite(output_path, b"x")
 
-        with patch("asyncio.create_subprocess_exec", return_value=mock_process), patch(
-            "asyncio.wait_for", return_value=(b"success", b"")
-        ):
-            # Simulate FFmpeg creating output file
-            output_path.write_text("fake video content")
+        # Run the conversion
+        await ffmpeg_runner.convert_audio_to_video(input_path, output_path)
 
-            # Run the conversion
-            await ffmpeg_runner.convert_audio_to_video(input_path, output_path)
-
-            # Verify results
-            assert output_path.exists()
-            assert storage.file_exists(output_path)
-            assert output_path.stat().st_size > 0
+        # Verify results
+        assert output_path.exists()
+        assert storage.file_exists(output_path)
+        assert output_path.stat().st_size > 0
 
-            # Test cleanup
-            storage.cleanup_inbox_file(input_path)
-            assert not input_path.exists()
+        # Test cleanup
+        storage.cleanup_inbox_file(input_path)
+        assert not input_path.exists()
 
-    @pytest.mark.asyncio
-    async def test_workflow_with_cleanup_enabled(self, integration_settings, setup_integration_env):
+    @pytest.mark.parametrize("integration_settings", [{"delete_on_success": True}], indirect=True)
+    async def test_workflow_with_cleanup_enabled(self, integration_settings, setup_integration_env, ffmpeg_process):
         """Test workflow with automatic cleanup enabled."""
-        # Enable cleanup
-        integration_settings.delete_on_success = True
+        assert integration_settings.delete_on_success
 
         storage, ffmpeg_runner, input_path, output_path = setup_integration_env
 
-        # Mock successful FFmpeg execution
-        mock_process = AsyncMock()
-        mock_process.returncode = 0
-        mock_process.communicate.return_value = (b"success", b"")
-
-        with patch("asyncio.create_subprocess_exec", return_value=mock_process), patch(
-            "asyncio.wait_for", return_value=(b"success", b"")
-        ):
-            # Simulate FFmpeg creating output file
-            output_path.write_text("fake video content")
+        # Simulate FFmpeg creating output file
+        _fastwrite(output_path, b"x")
 
-            # Run conversion
-            await ffmpeg_runner.convert_audio_to_video(input_path, output_path)
+        # Run conversion
+        await ffmpeg_runner.convert_audio_to_video(input_path, output_path)
 
-            # Verify output exists before cleanup
-            assert output_path.exists()
+        # Verify output exists before cleanup
+        assert output_path.exists()
 
-            # Test automatic cleanup
-            storage.cleanup_output_file(output_path)
-            assert not output_path.exists()  # Should be deleted
+        # Test automatic cleanup
+        storage.cleanup_output_file(output_path)
+        assert not output_path.exists()  # Should be deleted
 
-    @pytest.mark.asyncio
-    async def test_workflow_with_file_size_validation(self, integration_settings, temp_dir):
+    # Very small file size limit
+    @pytest.mark.parametrize("integration_settings", [{"max_file_size": 10}], indirect=True)
+    async def test_workflow_with_file_size_validation(self, temp_dir, fs, integration_settings, storage):
         """Test workflow with file size validation."""
-        # Set very small file size limit
-        integration_settings.max_file_size = 10
-
-        storage = StorageManager(integration_settings)
-
         # Create a file that exceeds the limit
         large_audio = storage.get_inbox_path("large_audio.m4a")
-        large_audio.write_text("This content exceeds the 10-byte limit")
+        _fastwrite(large_audio, b"This content exceeds the 10-byte limit")
 
         # Validation should fail
         assert not storage.validate_file_size(large_audio)
 
         # Create a file within the limit
         small_audio = storage.get_inbox_path("small_audio.m4a")
-        small_audio.write_text("small")
+        _fastwrite(small_audio, b"small")
 
         # Validation should pass
         assert storage.validate_file_size(small_audio)
 
-    @pytest.mark.asyncio
-    async def test_workflow_error_handling(self, setup_integration_env):
+    async def test_workflow_error_handling(self, setup_integration_env, ffmpeg_process):
         """Test error handling in the complete workflow."""
         storage, ffmpeg_runner, input_path, output_path = setup_integration_env
 
         # Test with FFmpeg failure
-        mock_process = AsyncMock()
-        mock_process.returncode = 1
-        mock_process.communicate.return_value = (b"", b"FFmpeg error")
+        ffmpeg_process.returncode = 1
+        ffmpeg_process.stderr = _stderr_reader(b"FFmpeg error\n")
 
-        with patch("asyncio.create_subprocess_exec", return_value=mock_process), patch(
-            "asyncio.wait_for", return_value=(b"", b"FFmpeg error")
-        ):
-            from src.ffmpeg_runner import FFmpegError
+        from src.ffmpeg_runner import FFmpegError
 
-            with pytest.raises(FFmpegError):
-                await ffmpeg_runner.convert_audio_to_video(input_path, output_path)
+        with pytest.raises(FFmpegError, match="FFmpeg failed with return code 1") as exc_info:
+            await ffmpeg_runner.convert_audio_to_video(input_path, output_path)
 
-            # Verify original files still exist after error
-            assert input_path.exists()
-            assert not output_path.exists()
+        # The stderr read from the process is what the failure reports
+        assert exc_info.value.__cause__.stderr == "FFmpeg error\n"
 
-    def test_storage_directory_structure(self, integration_settings):
-        """Test that storage manager creates proper directory structure."""
-        storage = StorageManager(integration_settings)
+        # Verify original files still exist after error
+        assert input_path.exists()
+        assert not output_path.exists()
 
+    def test_storage_directory_structure(self, temp_dir, fs, storage):
+        """Test that storage manager creates proper directory structure."""
         # Verify all directories exist
         assert storage.work_dir.exists()
         assert storage.inbox_dir.exists()
@@ -171,10 +233,8 @@ class TestEndToEndWorkflow:
         assert storage.output_dir == storage.work_dir / "out"
         assert storage.assets_dir == storage.work_dir / "assets"
 
-    def test_path_generation_consistency(self, integration_settings):
+    def test_path_generation_consistency(self, storage):
         """Test that path generation is consistent across components."""
-        storage = StorageManager(integration_settings)
-
         test_filename = "test_audio.m4a"
 
         # Test inbox path
@@ -188,9 +248,8 @@ class TestEndToEndWorkflow:
         assert output_path.suffix == ".mp4"
         assert output_path.stem == Path(test_filename).stem
 
-    def test_settings_integration_with_components(self, integration_settings):
+    def test_settings_integration_with_components(self, integration_settings, storage):
         """Test that settings are properly integrated across all components."""
-        storage = StorageManager(integration_settings)
         ffmpeg_runner = FFmpegRunner(integration_settings)
 
         # Verify settings propagation
@@ -204,44 +263,33 @@ class TestEndToEndWorkflow:
 
         assert storage.work_dir == integration_settings.work_dir
 
-    @pytest.mark.asyncio
-    async def test_multiple_file_processing(self, integration_settings, sample_audio_content):
+    async def test_multiple_file_processing(self, integration_settings, storage, session_sample_blobs, ffmpeg_process):
         """Test processing multiple files in sequence."""
-        # Create fresh storage manager without pre-existing files
-        storage = StorageManager(integration_settings)
+        audio_blob, background_blob = session_sample_blobs
         ffmpeg_runner = FFmpegRunner(integration_settings)
 
-        # Create background image
-        background_path = integration_settings.background_image
-        background_path.write_bytes(b"fake background image")
+        # Link background image
+        _materialize(background_blob, integration_settings.background_image)
 
-        # Create multiple test files
+        # Link multiple test files to the shared sample audio
         files = []
         for i in range(3):
             filename = f"audio_{i}.m4a"
             input_path = storage.get_inbox_path(filename)
             output_path = storage.get_output_path(filename)
-            input_path.write_bytes(sample_audio_content)
+            _materialize(audio_blob, input_path)
             files.append((input_path, output_path))
 
-        # Mock FFmpeg execution
-        mock_process = AsyncMock()
-        mock_process.returncode = 0
-        mock_process.communicate.return_value = (b"success", b"")
-
-        with patch("asyncio.create_subprocess_exec", return_value=mock_process), patch(
-            "asyncio.wait_for", return_value=(b"success", b"")
-        ):
-            # Process all files
-            for input_path, output_path in files:
-                # Simulate FFmpeg creating output
-                output_path.write_text("fake video content")
+        # Process all files
+        for input_path, output_path in files:
+            # Simulate FFmpeg creating output
+            _fastwrite(output_path, b"x")
 
-                await ffmpeg_runner.convert_audio_to_video(input_path, output_path)
+            await ffmpeg_runner.convert_audio_to_video(input_path, output_path)
 
-                # Verify each file
-                assert output_path.exists()
-                assert storage.file_exists(output_path)
+            # Verify each file
+            assert output_path.exists()
+            assert storage.file_exists(output_path)
 
         # Verify all files are listed correctly
         inbox_files = storage.list_inbox_files()
@@ -250,21 +298,17 @@ class TestEndToEndWorkflow:
         assert len(inbox_files) == 3
         assert len(output_files) == 3
 
-    def test_disk_usage_tracking(
-        self, integration_settings, sample_audio_content, sample_background_image
-    ):
+    def test_disk_usage_tracking(self, temp_dir, fs, storage, sample_audio_content, sample_background_image):
         """Test disk usage tracking functionality."""
-        storage = StorageManager(integration_settings)
-
         # Create files in different directories
         inbox_file = storage.get_inbox_path("test.m4a")
-        inbox_file.write_bytes(sample_audio_content)
+        _fastwrite(inbox_file, sample_audio_content)
 
         output_file = storage.get_output_path("test.m4a")
-        output_file.write_text("fake video content")
+        _fastwrite(output_file, b"x")
 
         assets_file = storage.assets_dir / "bg.jpg"
-        assets_file.write_bytes(sample_background_image)
+        _fastwrite(assets_file, sample_background_image)
 
         # Get usage information
         usage = storage.get_disk_usage()
@@ -275,17 +319,12 @@ class TestEndToEndWorkflow:
         assert usage["assets"] > 0
         assert usage["work"] >= usage["inbox"] + usage["output"] + usage["assets"]
 
-    @pytest.mark.asyncio
-    async def test_ffmpeg_validation_integration(self, integration_settings):
+    async def test_ffmpeg_validation_integration(self, integration_settings, ffmpeg_process):
         """Test FFmpeg validation in integration context."""
         ffmpeg_runner = FFmpegRunner(integration_settings)
 
         # Mock FFmpeg validation
-        mock_process = AsyncMock()
-        mock_process.returncode = 0
-
-        with patch("asyncio.create_subprocess_exec", return_value=mock_process), patch(
-            "asyncio.wait_for", return_value=(b"ffmpeg version", b"")
-        ):
-            is_available = await ffmpeg_runner.validate_ffmpeg_installation()
-            assert is_available is True
+        ffmpeg_process.output = (b"ffmpeg version", b"")
+
+        is_available = await ffmpeg_runner.validate_ffmpeg_installation()
+        assert is_available is True
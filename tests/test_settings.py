@@ -0,0 +1,88 @@
+"""Tests for settings module."""
+
+import dataclasses
+from unittest.mock import patch
+
+import pytest
+
+from src.settings import BotMode, Settings
+
+# (env overrides, expected error message) for invalid configurations
+ENV_CASES = [
+    ({"CHANNEL_ID": "not_a_number"}, "CHANNEL_ID must be a valid integer"),
+    ({"MAX_FILE_SIZE": "not_a_number"}, "invalid literal"),
+    ({"MAX_FILE_SIZE": "0"}, "Max file size must be positive"),
+    ({"PROCESSING_TIMEOUT": "0"}, "Processing timeout must be positive"),
+    ({"FFMPEG_THREADS": "-1"}, "FFmpeg threads must not be negative"),
+    ({"MAX_CONCURRENT_FFMPEG": "0"}, "Max concurrent FFmpeg processes must be positive"),
+    ({"MAX_CONCURRENT_TRANSCRIPTIONS": "0"}, "Max concurrent transcriptions must be positive"),
+    ({"BOT_MODE": "podcast"}, "BOT_MODE must be 'video' or 'transcription'"),
+]
+
+
+class TestSettings:
+    """Test cases for Settings class."""
+
+    @pytest.fixture(autouse=True)
+    def _base_env(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Set the required variables; each test layers its own overrides on top."""
+        monkeypatch.setenv("DISCORD_TOKEN", "test_token_123")
+        monkeypatch.setenv("CHANNEL_ID", "123456789")
+
+    def test_from_env_defaults(self) -> None:
+        """Test settings load from environment with defaults for unset values."""
+        settings = Settings.from_env()
+
+        assert settings.discord_token == "test_token_123"
+        assert settings.channel_id == 123456789
+        assert settings.bot_mode == BotMode.VIDEO
+        assert settings.audio_bitrate == 96
+        assert settings.max_concurrent_transcriptions == 5
+
+    def test_from_env_returns_immutable_settings(self) -> None:
+        """Test settings shared through the from_env cache cannot be mutated."""
+        settings = Settings.from_env()
+
+        assert Settings.from_env() is settings
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            settings.max_file_size = 10
+
+        assert dataclasses.replace(settings, max_file_size=10).max_file_size == 10
+
+    def test_from_env_loads_dotenv_once(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test the .env file is parsed by the first from_env call only."""
+        monkeypatch.setattr("src.settings._dotenv_loaded", False)
+
+        with patch("src.settings.load_dotenv") as mock_load_dotenv:
+            Settings.from_env()
+            Settings.from_env()
+
+        mock_load_dotenv.assert_called_once_with()
+
+    @pytest.mark.parametrize("name", ["DISCORD_TOKEN", "CHANNEL_ID"])
+    def test_from_env_missing_required(self, monkeypatch: pytest.MonkeyPatch, name: str) -> None:
+        """Test missing required variables are rejected."""
+        monkeypatch.delenv(name)
+
+        with pytest.raises(ValueError, match=f"{name} environment variable is required"):
+            Settings.from_env()
+
+    @pytest.mark.parametrize(("env_overrides", "match"), ENV_CASES)
+    def test_from_env_invalid(self, monkeypatch: pytest.MonkeyPatch, env_overrides: dict[str, str], match: str) -> None:
+        """Test invalid values are rejected with a descriptive error."""
+        for name, value in env_overrides.items():
+            monkeypatch.setenv(name, value)
+
+        with pytest.raises(ValueError, match=match):
+            Settings.from_env()
+
+    @pytest.mark.parametrize(("bitrate", "expect_ok"), [(63, False), (64, True), (96, True), (128, True), (129, False)])
+    def test_from_env_audio_bitrate(self, monkeypatch: pytest.MonkeyPatch, bitrate: int, expect_ok: bool) -> None:
+        """Test the audio bitrate bounds, valid and invalid values in one table."""
+        monkeypatch.setenv("AUDIO_BITRATE", str(bitrate))
+
+        if expect_ok:
+            assert Settings.from_env().audio_bitrate == bitrate
+        else:
+            with pytest.raises(ValueError, match="AUDIO_BITRATE must be between 64 and 128 kbps"):
+                Settings.from_env()
@@ -1,31 +1,77 @@
 """Unit tests for the storage module."""
 
-from unittest.mock import Mock
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
 
 import pytest
 
-from src.settings import Settings
 from src.storage import StorageManager
 
 
+def _touch(path: Path, data: bytes = b"x") -> None:
+    """Write a small test file with raw os calls, skipping the text IO layer."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+
+
 class TestStorageManager:
     """Test cases for StorageManager class."""
 
-    @pytest.fixture
-    def mock_settings(self, temp_dir):
-        """Create mock settings for testing."""
-        settings = Mock(spec=Settings)
-        settings.work_dir = temp_dir
-        settings.background_image = temp_dir / "assets" / "bg.jpg"
-        settings.delete_on_success = False
-        settings.max_file_size = 25 * 1024 * 1024  # 25MB
-        return settings
-
-    @pytest.fixture
-    def storage_manager(self, mock_settings):
+    @pytest.fixture(scope="class")
+    @classmethod
+    def class_temp_dir(cls, temp_base):
+        """Create a work directory shared by the tests in this class."""
+        with tempfile.TemporaryDirectory(dir=temp_base) as tmp_dir:
+            yield Path(tmp_dir)
+
+    @pytest.fixture(scope="class")
+    @classmethod
+    def mock_settings(cls, class_temp_dir):
+        """Create mock settings for testing.
+
+        StorageManager only reads these attributes, so a plain namespace is enough.
+        """
+        return SimpleNamespace(
+            work_dir=class_temp_dir,
+            background_image=class_temp_dir / "assets" / "bg.jpg",
+            delete_on_success=False,
+            audio_only=False,
+            max_file_size=25 * 1024 * 1024,  # 25MB
+        )
+
+    @pytest.fixture(scope="class")
+    @classmethod
+    def storage_manager(cls, mock_settings):
         """Create StorageManager instance for testing."""
         return StorageManager(mock_settings)
 
+    @pytest.fixture(autouse=True)
+    def _reset_storage(self, storage_manager, mock_settings):
+        """Undo each test's changes to the shared settings, hash index, and work directory."""
+        defaults = dict(vars(mock_settings))
+        yield
+
+        vars(mock_settings).update(defaults)
+        storage_manager._hash_index.clear()
+
+        layout = {storage_manager.inbox_dir, storage_manager.output_dir, storage_manager.assets_dir}
+        for directory in (storage_manager.work_dir, *layout):
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.path in {os.fspath(path) for path in layout}:
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        shutil.rmtree(entry.path)
+                    else:
+                        os.unlink(entry.path)
+
     def test_init_creates_directories(self, storage_manager, mock_settings):
         """Test that StorageManager.__init__ creates required directories."""
         assert storage_manager.work_dir == mock_settings.work_dir
@@ -34,10 +80,10 @@ class TestStorageManager:
         assert storage_manager.assets_dir == mock_settings.work_dir / "assets"
 
         # Check directories were created
-        assert storage_manager.work_dir.exists()
-        assert storage_manager.inbox_dir.exists()
-        assert storage_manager.output_dir.exists()
-        assert storage_manager.assets_dir.exists()
+        assert os.path.exists(storage_manager.work_dir)
+        assert os.path.exists(storage_manager.inbox_dir)
+        assert os.path.exists(storage_manager.output_dir)
+        assert os.path.exists(storage_manager.assets_dir)
 
     def test_get_inbox_path(self, storage_manager):
         """Test get_inbox_path generates correct paths."""
@@ -47,19 +93,102 @@ class TestStorageManager:
         assert path == storage_manager.inbox_dir / filename
         assert path.name == filename
 
-    def test_get_output_path(self, storage_manager):
-        """Test get_output_path generates correct MP4 paths."""
-        test_cases = [
+    @pytest.mark.parametrize(
+        ("input_filename", "expected_output"),
+        [
             ("audio.m4a", "audio.mp4"),
             ("voice_note.mp3", "voice_note.mp4"),
             ("recording.wav", "recording.mp4"),
             ("file_without_ext", "file_without_ext.mp4"),
-        ]
-
-        for input_filename, expected_output in test_cases:
-            path = storage_manager.get_output_path(input_filename)
-            assert path == storage_manager.output_dir / expected_output
-            assert path.suffix == ".mp4"
+        ],
+    )
+    def test_get_output_path(self, storage_manager, input_filename, expected_output):
+        """Test get_output_path generates correct MP4 paths."""
+        path = storage_manager.get_output_path(input_filename)
+        assert path == storage_manager.output_dir / expected_output
+        assert path.suffix == ".mp4"
+
+    def test_get_output_path_audio_only(self, mock_settings):
+        """Test get_output_path generates M4A paths in audio-only mode."""
+        mock_settings.audio_only = True
+        storage_manager = StorageManager(mock_settings)
+
+        path = storage_manager.get_output_path("voice_note.ogg")
+        assert path == storage_manager.output_dir / "voice_note.m4a"
+
+    def test_content_hash(self, storage_manager):
+        """Test content_hash returns the SHA-256 hex digest of the file."""
+        test_file = storage_manager.inbox_dir / "voice.m4a"
+        _touch(test_file, b"audio content")
+
+        assert storage_manager.content_hash(test_file) == hashlib.sha256(b"audio content").hexdigest()
+
+    def test_content_hash_includes_conversion(self, storage_manager):
+        """Test the same content hashes differently under different conversion settings."""
+        test_file = storage_manager.inbox_dir / "voice.m4a"
+        _touch(test_file, b"audio content")
+
+        video = storage_manager.content_hash(test_file, "video|aac|96")
+
+        assert video == storage_manager.content_hash(test_file, "video|aac|96")
+        assert video != storage_manager.content_hash(test_file, "audio_only|aac|96")
+        assert video != storage_manager.content_hash(test_file)
+
+    def test_output_hash_index_persisted(self, storage_manager, mock_settings):
+        """Test recorded output hashes survive a new StorageManager instance."""
+        output_file = storage_manager.output_dir / "voice.mp4"
+        _touch(output_file, b"video")
+        storage_manager.record_output_hash("abc123", output_file)
+
+        reloaded = StorageManager(mock_settings)
+        assert reloaded.find_output_by_hash("abc123") == output_file
+        assert reloaded.find_output_by_hash("unknown") is None
+
+    def test_find_output_by_hash_drops_missing_output(self, storage_manager):
+        """Test hashes whose output was deleted are forgotten."""
+        output_file = storage_manager.output_dir / "voice.mp4"
+        _touch(output_file, b"video")
+        storage_manager.record_output_hash("abc123", output_file)
+        output_file.unlink()
+
+        assert storage_manager.find_output_by_hash("abc123") is None
+
+    def test_link_output_and_release(self, storage_manager):
+        """Test duplicates get their own link and a released path is removed before reconversion."""
+        existing = storage_manager.output_dir / "first.mp4"
+        _touch(existing, b"video")
+        storage_manager.record_output_hash("abc123", existing)
+        duplicate = storage_manager.output_dir / "second.mp4"
+
+        storage_manager.link_output(existing, duplicate)
+        assert not duplicate.is_symlink()
+        assert duplicate.read_bytes() == b"video"
+
+        storage_manager.release_output_path(duplicate)
+        assert not os.path.exists(duplicate)
+        assert existing.read_bytes() == b"video"
+
+        storage_manager.release_output_path(existing)
+        assert storage_manager.find_output_by_hash("abc123") is None
+
+    def test_duplicate_survives_reupload_of_original_name(self, storage_manager):
+        """Test reconverting the original name leaves a duplicate's content and the hash index correct."""
+        original = storage_manager.output_dir / "voice.mp4"
+        _touch(original, b"first recording")
+        storage_manager.record_output_hash("first", original)
+
+        # Duplicate upload of the same audio under another name
+        duplicate = storage_manager.output_dir / "copy.mp4"
+        storage_manager.link_output(storage_manager.find_output_by_hash("first"), duplicate)
+
+        # New audio uploaded under the original name; FFmpeg overwrites with -y
+        storage_manager.release_output_path(original)
+        _touch(original, b"second recording")
+        storage_manager.record_output_hash("second", original)
+
+        assert duplicate.read_bytes() == b"first recording"
+        assert storage_manager.find_output_by_hash("first") is None
+        assert storage_manager.find_output_by_hash("second") == original
 
     def test_get_background_image_path(self, storage_manager, mock_settings):
         """Test get_background_image_path returns correct path."""
@@ -70,23 +199,23 @@ class TestStorageManager:
         """Test cleanup_inbox_file removes existing file in inbox."""
         # Create a test file in inbox
         test_file = storage_manager.inbox_dir / "test.txt"
-        test_file.write_text("test content")
-        assert test_file.exists()
+        _touch(test_file, b"test content")
+        assert os.path.exists(test_file)
 
         # Clean up the file
         storage_manager.cleanup_inbox_file(test_file)
-        assert not test_file.exists()
+        assert not os.path.exists(test_file)
 
     def test_cleanup_inbox_file_outside_inbox(self, storage_manager, temp_dir):
         """Test cleanup_inbox_file doesn't remove files outside inbox."""
         # Create a file outside inbox
         outside_file = temp_dir / "outside.txt"
-        outside_file.write_text("test content")
-        assert outside_file.exists()
+        _touch(outside_file, b"test content")
+        assert os.path.exists(outside_file)
 
         # Try to clean it up (should not remove it)
         storage_manager.cleanup_inbox_file(outside_file)
-        assert outside_file.exists()
+        assert os.path.exists(outside_file)
 
     def test_cleanup_inbox_file_nonexistent(self, storage_manager):
         """Test cleanup_inbox_file handles nonexistent files gracefully."""
@@ -98,12 +227,12 @@ class TestStorageManager:
         """Test cleanup_output_file doesn't delete when deletion is disabled."""
         # Create a test file in output
         test_file = storage_manager.output_dir / "test.mp4"
-        test_file.write_text("test content")
-        assert test_file.exists()
+        _touch(test_file, b"test content")
+        assert os.path.exists(test_file)
 
         # Clean up should not remove file when deletion is disabled
         storage_manager.cleanup_output_file(test_file)
-        assert test_file.exists()
+        assert os.path.exists(test_file)
 
     def test_cleanup_output_file_deletion_enabled(self, storage_manager, mock_settings):
         """Test cleanup_output_file deletes when deletion is enabled."""
@@ -112,12 +241,12 @@ class TestStorageManager:
 
         # Create a test file in output
         test_file = storage_manager.output_dir / "test.mp4"
-        test_file.write_text("test content")
-        assert test_file.exists()
+        _touch(test_file, b"test content")
+        assert os.path.exists(test_file)
 
         # Clean up should remove file when deletion is enabled
         storage_manager.cleanup_output_file(test_file)
-        assert not test_file.exists()
+        assert not os.path.exists(test_file)
 
     def test_cleanup_output_file_outside_output(self, storage_manager, mock_settings, temp_dir):
         """Test cleanup_output_file doesn't remove files outside output directory."""
@@ -126,33 +255,31 @@ class TestStorageManager:
 
         # Create a file outside output
         outside_file = temp_dir / "outside.mp4"
-        outside_file.write_text("test content")
-        assert outside_file.exists()
+        _touch(outside_file, b"test content")
+        assert os.path.exists(outside_file)
 
         # Try to clean it up (should not remove it)
         storage_manager.cleanup_output_file(outside_file)
-        assert outside_file.exists()
+        assert os.path.exists(outside_file)
 
     def test_cleanup_all_inbox_files(self, storage_manager):
         """Test cleanup_all_inbox_files removes all files from inbox."""
         # Create multiple test files
-        files = []
-        for i in range(3):
-            test_file = storage_manager.inbox_dir / f"test_{i}.txt"
-            test_file.write_text(f"content {i}")
-            files.append(test_file)
+        names = {f"test_{i}.txt" for i in range(3)}
+        for name in names:
+            _touch(storage_manager.inbox_dir / name, name.encode())
 
-        # Verify files exist
-        for file_path in files:
-            assert file_path.exists()
+        # Verify files exist with one directory read
+        with os.scandir(storage_manager.inbox_dir) as entries:
+            assert {entry.name for entry in entries} == names
 
         # Clean up all files
         count = storage_manager.cleanup_all_inbox_files()
 
         # Verify cleanup
         assert count == 3
-        for file_path in files:
-            assert not file_path.exists()
+        with os.scandir(storage_manager.inbox_dir) as entries:
+            assert next(entries, None) is None
 
     def test_cleanup_all_inbox_files_empty_directory(self, storage_manager):
         """Test cleanup_all_inbox_files on empty directory."""
@@ -161,14 +288,15 @@ class TestStorageManager:
 
     def test_file_exists(self, storage_manager):
         """Test file_exists method."""
-        # Test with existing file
-        existing_file = storage_manager.inbox_dir / "existing.txt"
-        existing_file.write_text("content")
-        assert storage_manager.file_exists(existing_file) is True
+        _touch(storage_manager.inbox_dir / "existing.txt", b"content")
 
-        # Test with nonexistent file
-        nonexistent_file = storage_manager.inbox_dir / "nonexistent.txt"
-        assert storage_manager.file_exists(nonexistent_file) is False
+        # One directory scan gives the expected answer for each name
+        with os.scandir(storage_manager.inbox_dir) as entries:
+            names = {entry.name for entry in entries}
+        assert names == {"existing.txt"}
+
+        for name in ("existing.txt", "nonexistent.txt"):
+            assert storage_manager.file_exists(storage_manager.inbox_dir / name) is (name in names)
 
         # Test with directory (should return False)
         assert storage_manager.file_exists(storage_manager.inbox_dir) is False
@@ -176,12 +304,12 @@ class TestStorageManager:
     def test_get_file_size(self, storage_manager):
         """Test get_file_size method."""
         # Test with existing file
-        test_content = "test content with some length"
+        test_content = b"test content with some length"
         test_file = storage_manager.inbox_dir / "test.txt"
-        test_file.write_text(test_content)
+        _touch(test_file, test_content)
 
         size = storage_manager.get_file_size(test_file)
-        assert size == len(test_content.encode())
+        assert size == len(test_content)
 
         # Test with nonexistent file
         nonexistent_file = storage_manager.inbox_dir / "nonexistent.txt"
@@ -192,7 +320,7 @@ class TestStorageManager:
         """Test validate_file_size with file within size limit."""
         # Create small file
         test_file = storage_manager.inbox_dir / "small.txt"
-        test_file.write_text("small content")
+        _touch(test_file, b"small content")
 
         assert storage_manager.validate_file_size(test_file) is True
 
@@ -203,7 +331,7 @@ class TestStorageManager:
 
         # Create file larger than limit
         test_file = storage_manager.inbox_dir / "large.txt"
-        test_file.write_text("this content exceeds the 5-byte limit")
+        _touch(test_file, b"this content exceeds the 5-byte limit")
 
         assert storage_manager.validate_file_size(test_file) is False
 
@@ -216,13 +344,13 @@ class TestStorageManager:
         """Test get_disk_usage method."""
         # Create files in different directories
         inbox_file = storage_manager.inbox_dir / "inbox_file.txt"
-        inbox_file.write_text("inbox content")
+        _touch(inbox_file, b"inbox content")
 
         output_file = storage_manager.output_dir / "output_file.mp4"
-        output_file.write_text("output content")
+        _touch(output_file, b"output content")
 
         assets_file = storage_manager.assets_dir / "bg.jpg"
-        assets_file.write_text("background image data")
+        _touch(assets_file, b"background image data")
 
         usage = storage_manager.get_disk_usage()
 
@@ -237,13 +365,25 @@ class TestStorageManager:
         assert usage["assets"] > 0
         assert usage["work"] >= usage["inbox"] + usage["output"] + usage["assets"]
 
+    def test_get_disk_usage_nested_directories(self, storage_manager):
+        """Test get_disk_usage counts files in nested directories exactly once."""
+        nested_dir = storage_manager.output_dir / "2025" / "10"
+        nested_dir.mkdir(parents=True)
+        _touch(nested_dir / "video.mp4", b"x" * 100)
+        _touch(storage_manager.output_dir / "top.mp4", b"y" * 20)
+
+        usage = storage_manager.get_disk_usage()
+
+        assert usage["output"] == 120
+        assert usage["work"] == 120
+
     def test_list_inbox_files(self, storage_manager):
         """Test list_inbox_files method."""
         # Create test files
         file1 = storage_manager.inbox_dir / "file1.txt"
         file2 = storage_manager.inbox_dir / "file2.mp3"
-        file1.write_text("content1")
-        file2.write_text("content2")
+        _touch(file1, b"content1")
+        _touch(file2, b"content2")
 
         # Create a subdirectory (should be ignored)
         subdir = storage_manager.inbox_dir / "subdir"
@@ -266,8 +406,8 @@ class TestStorageManager:
         # Create test files
         file1 = storage_manager.output_dir / "video1.mp4"
         file2 = storage_manager.output_dir / "video2.mp4"
-        file1.write_text("video1 content")
-        file2.write_text("video2 content")
+        _touch(file1, b"video1 content")
+        _touch(file2, b"video2 content")
 
         files = storage_manager.list_output_files()
 
@@ -1,24 +1,113 @@
 """Tests for transcription module."""
 
+import asyncio
+import dataclasses
+import os
+import re
+import tempfile
+from collections.abc import AsyncIterator, Iterator, Mapping
 from datetime import datetime
 from pathlib import Path
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
+import pytest_asyncio
 from aiohttp import ClientError
 
-from src.settings import Settings
-from src.transcription import TranscriptionHandler
+from src.settings import BotMode, Settings
+from src.transcription import ERROR_BODY_LIMIT, TranscriptionHandler, WhisperError
+
+# Daily note filename, YYYY-MM-DD.md
+_MD_NAME_RE = re.compile(r"^\d{4}-\d{2}-\d{2}\.md$")
+
+
+class _FakeResponse:
+    """Minimal stand-in for an aiohttp response."""
+
+    def __init__(self, payload: object = None, status: int = 200, body: bytes = b"") -> None:
+        self.payload = payload
+        self.status = status
+        self.body = body
+        self.headers: dict[str, str] = {}
+        self.json_calls = 0
+
+    async def json(self) -> object:
+        self.json_calls += 1
+        return self.payload
+
+    async def read(self) -> bytes:
+        return self.body
+
+
+class _FakeContext:
+    """Async context manager yielding a fake response, as session.post does."""
+
+    def __init__(self, response: _FakeResponse) -> None:
+        self.response = response
+
+    async def __aenter__(self) -> _FakeResponse:
+        return self.response
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        return None
+
+
+class _FakeSession:
+    """Minimal stand-in for aiohttp.ClientSession answering every POST with one response."""
+
+    def __init__(self, response: _FakeResponse) -> None:
+        self.response = response
+        self.closed = False
+        self.post_count = 0
+
+    def post(self, *args: object, **kwargs: object) -> _FakeContext:
+        self.post_count += 1
+        return _FakeContext(self.response)
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture(scope="module")
+def _client_session_patch() -> Iterator[Mock]:
+    """Patch aiohttp.ClientSession once for the whole module."""
+    with patch("src.transcription.aiohttp.ClientSession") as mock_session:
+        yield mock_session
+
+
+@pytest.fixture(scope="module")
+def transcription_settings() -> Settings:
+    """Create transcription-mode settings once for the module; tests derive variants with replace()."""
+    return Settings(discord_token="test_token_123", channel_id=123456789, bot_mode=BotMode.TRANSCRIPTION)
+
+
+@pytest.fixture(scope="module")
+def fake_audio_path(temp_base: Path | None) -> Iterator[Path]:
+    """Create one audio file for the module; the handler only reads it."""
+    with tempfile.TemporaryDirectory(dir=temp_base) as tmp_dir:
+        audio_path = Path(tmp_dir) / "test.ogg"
+        audio_path.write_bytes(b"fake audio content")
+        yield audio_path
+
+
+@pytest.fixture
+def client_session_mock(_client_session_patch: Mock) -> Mock:
+    """Return the patched ClientSession class, reset for this test."""
+    _client_session_patch.reset_mock(return_value=True, side_effect=True)
+    return _client_session_patch
 
 
 class TestGenerateDailyTemplate:
     """Tests for _generate_daily_template method."""
 
-    def test_generate_daily_template_format(self, mock_transcription_env_vars: None, temp_dir: Path) -> None:
-        """Test that daily template has correct Obsidian format."""
-        settings = Settings.from_env()
-        handler = TranscriptionHandler(settings)
+    @pytest.fixture(scope="class")
+    @classmethod
+    def handler(cls, transcription_settings: Settings) -> TranscriptionHandler:
+        """Create one handler for the class; templates depend only on the date."""
+        return TranscriptionHandler(transcription_settings)
 
+    def test_generate_daily_template_format(self, handler: TranscriptionHandler) -> None:
+        """Test that daily template has correct Obsidian format."""
         # Test with a specific date
         test_date = datetime(2025, 10, 11, 15, 30, 45)
         template = handler._generate_daily_template(test_date)
@@ -43,32 +132,16 @@ class TestGenerateDailyTemplate:
         assert "[[2025-10-06|06]]" in template  # Monday
         assert "[[2025-10-12|12]]" in template  # Sunday
 
-    def test_generate_daily_template_quarter_calculation(self, mock_transcription_env_vars: None, temp_dir: Path) -> None:
+    @pytest.mark.parametrize(
+        ("date", "quarter"),
+        [(datetime(2025, 1, 15), "Q1"), (datetime(2025, 4, 15), "Q2"), (datetime(2025, 7, 15), "Q3"), (datetime(2025, 10, 15), "Q4")],
+    )
+    def test_generate_daily_template_quarter_calculation(self, handler: TranscriptionHandler, date: datetime, quarter: str) -> None:
         """Test quarter calculation for different months."""
-        settings = Settings.from_env()
-        handler = TranscriptionHandler(settings)
-
-        # Q1: January
-        template_q1 = handler._generate_daily_template(datetime(2025, 1, 15))
-        assert "[[2025-Q1|Q1]]" in template_q1
+        assert f"[[2025-{quarter}|{quarter}]]" in handler._generate_daily_template(date)
 
-        # Q2: April
-        template_q2 = handler._generate_daily_template(datetime(2025, 4, 15))
-        assert "[[2025-Q2|Q2]]" in template_q2
-
-        # Q3: July
-        template_q3 = handler._generate_daily_template(datetime(2025, 7, 15))
-        assert "[[2025-Q3|Q3]]" in template_q3
-
-        # Q4: October
-        template_q4 = handler._generate_daily_template(datetime(2025, 10, 15))
-        assert "[[2025-Q4|Q4]]" in template_q4
-
-    def test_generate_daily_template_year_boundary(self, mock_transcription_env_vars: None, temp_dir: Path) -> None:
+    def test_generate_daily_template_year_boundary(self, handler: TranscriptionHandler) -> None:
         """Test week navigation across year boundary."""
-        settings = Settings.from_env()
-        handler = TranscriptionHandler(settings)
-
         # Date near year end
         test_date = datetime(2025, 12, 31)
         template = handler._generate_daily_template(test_date)
@@ -76,117 +149,161 @@ class TestGenerateDailyTemplate:
         # Should contain 2025 and potentially 2026 week references
         assert "2025" in template or "2026" in template
 
+    def test_generate_daily_template_53_week_year(self, handler: TranscriptionHandler) -> None:
+        """Test week navigation into and out of ISO week 53."""
+        template = handler._generate_daily_template(datetime(2020, 12, 31))
+        assert "❮ [[2020-W52|Week 52]] | Week 53 | [[2021-W01|Week 1]] ❯" in template
+
+        template = handler._generate_daily_template(datetime(2021, 1, 4))
+        assert "❮ [[2020-W53|Week 53]] | Week 1 | [[2021-W02|Week 2]] ❯" in template
+
 
 class TestTranscribeAudio:
     """Tests for transcribe_audio method."""
 
-    @pytest.mark.asyncio
     async def test_transcribe_audio_success(
         self,
-        mock_transcription_env_vars: None,
-        temp_dir: Path,
-        mock_whisper_response: dict[str, str],
+        transcription_settings: Settings,
+        fake_audio_path: Path,
+        mock_whisper_response: Mapping[str, str],
+        client_session_mock: Mock,
     ) -> None:
         """Test successful audio transcription."""
-        settings = Settings.from_env()
-        handler = TranscriptionHandler(settings)
-
-        # Create test audio file
-        audio_path = temp_dir / "test.ogg"
-        audio_path.write_bytes(b"fake audio content")
+        handler = TranscriptionHandler(transcription_settings)
 
         # Mock aiohttp session
-        with patch("aiohttp.ClientSession") as mock_session:
-            mock_response = AsyncMock()
-            mock_response.raise_for_status = Mock()
-            mock_response.json = AsyncMock(return_value=mock_whisper_response)
+        session = _FakeSession(_FakeResponse(mock_whisper_response))
+        client_session_mock.return_value = session
 
-            mock_context = AsyncMock()
-            mock_context.__aenter__ = AsyncMock(return_value=mock_response)
-            mock_context.__aexit__ = AsyncMock()
+        # Execute
+        result = await handler.transcribe_audio(fake_audio_path)
 
-            mock_post = Mock(return_value=mock_context)
-            mock_session.return_value.__aenter__.return_value.post = mock_post
+        # Verify
+        assert result == "This is a test transcription result."
+        assert session.post_count == 1
 
-            # Execute
-            result = await handler.transcribe_audio(audio_path)
+    async def test_transcribe_audio_reuses_session(
+        self,
+        transcription_settings: Settings,
+        fake_audio_path: Path,
+        mock_whisper_response: Mapping[str, str],
+        client_session_mock: Mock,
+    ) -> None:
+        """Test consecutive transcriptions share one session, closed by close()."""
+        handler = TranscriptionHandler(transcription_settings)
 
-            # Verify
-            assert result == "This is a test transcription result."
-            mock_post.assert_called_once()
+        session = _FakeSession(_FakeResponse(mock_whisper_response))
+        client_session_mock.return_value = session
 
-    @pytest.mark.asyncio
-    async def test_transcribe_audio_invalid_response(self, mock_transcription_env_vars: None, temp_dir: Path) -> None:
-        """Test transcription with invalid API response."""
-        settings = Settings.from_env()
-        handler = TranscriptionHandler(settings)
+        await handler.transcribe_audio(fake_audio_path)
+        await handler.transcribe_audio(fake_audio_path)
+        await handler.close()
 
-        audio_path = temp_dir / "test.ogg"
-        audio_path.write_bytes(b"fake audio content")
+        assert client_session_mock.call_count == 1
+        assert session.post_count == 2
+        assert session.closed
+
+    async def test_transcribe_audio_retries_rate_limit(
+        self,
+        transcription_settings: Settings,
+        fake_audio_path: Path,
+        mock_whisper_response: Mapping[str, str],
+        client_session_mock: Mock,
+    ) -> None:
+        """Test a 429 response is retried on the same session after Retry-After."""
+        handler = TranscriptionHandler(transcription_settings)
+
+        def response_context(response: Mock) -> AsyncMock:
+            context = AsyncMock()
+            context.__aenter__ = AsyncMock(return_value=response)
+            context.__aexit__ = AsyncMock(return_value=None)
+            return context
+
+        limited = Mock(status=429, headers={"Retry-After": "2"})
+        ok = Mock(status=200, headers={})
+        ok.json = AsyncMock(return_value=mock_whisper_response)
+
+        client_session_mock.return_value.post = Mock(side_effect=[response_context(limited), response_context(ok)])
+
+        with patch("src.transcription.asyncio.sleep", AsyncMock()) as mock_sleep:
+            result = await handler.transcribe_audio(fake_audio_path)
+
+        assert result == "This is a test transcription result."
+        mock_sleep.assert_awaited_once_with(2.0)
+        ok.json.assert_awaited_once()
+
+    async def test_transcribe_audio_invalid_response(
+        self,
+        transcription_settings: Settings,
+        fake_audio_path: Path,
+        client_session_mock: Mock,
+    ) -> None:
+        """Test transcription with invalid API response."""
+        handler = TranscriptionHandler(transcription_settings)
 
         # Mock response without 'text' field
-        with patch("src.transcription.aiohttp.ClientSession") as mock_session:
-            mock_response = AsyncMock()
-            mock_response.raise_for_status = Mock()
-            mock_response.json = AsyncMock(return_value={"error": "something"})
-
-            mock_context = AsyncMock()
-            mock_context.__aenter__ = AsyncMock(return_value=mock_response)
-            mock_context.__aexit__ = AsyncMock(return_value=None)
-
-            mock_session_instance = AsyncMock()
-            mock_session_instance.__aenter__ = AsyncMock(return_value=mock_session_instance)
-            mock_session_instance.__aexit__ = AsyncMock(return_value=None)
-            mock_session_instance.post = Mock(return_value=mock_context)
-            mock_session.return_value = mock_session_instance
-
-            # Should raise ValueError
-            with pytest.raises(ValueError, match="Invalid Whisper API response"):
-                await handler.transcribe_audio(audio_path)
-
-    @pytest.mark.asyncio
-    async def test_transcribe_audio_api_error(self, mock_transcription_env_vars: None, temp_dir: Path) -> None:
-        """Test transcription with API connection error."""
-        settings = Settings.from_env()
-        handler = TranscriptionHandler(settings)
-
-        audio_path = temp_dir / "test.ogg"
-        audio_path.write_bytes(b"fake audio content")
+        client_session_mock.return_value = _FakeSession(_FakeResponse({"error": "something"}))
 
-        # Mock API error
-        with patch("src.transcription.aiohttp.ClientSession") as mock_session:
-            mock_response = AsyncMock()
-            mock_response.raise_for_status = Mock(side_effect=ClientError("Connection failed"))
+        # Should raise ValueError
+        with pytest.raises(ValueError, match="Invalid Whisper API response"):
+            await handler.transcribe_audio(fake_audio_path)
+
+    async def test_transcribe_audio_api_error(
+        self,
+        transcription_settings: Settings,
+        fake_audio_path: Path,
+        client_session_mock: Mock,
+    ) -> None:
+        """Test an error status raises WhisperError without decoding the body as JSON."""
+        handler = TranscriptionHandler(transcription_settings)
 
-            mock_context = AsyncMock()
-            mock_context.__aenter__ = AsyncMock(return_value=mock_response)
-            mock_context.__aexit__ = AsyncMock(return_value=None)
+        # Mock API error
+        response = _FakeResponse(status=400, body=b"<html>" + b"x" * 1024)
+        client_session_mock.return_value = _FakeSession(response)
 
-            mock_session_instance = AsyncMock()
-            mock_session_instance.__aenter__ = AsyncMock(return_value=mock_session_instance)
-            mock_session_instance.__aexit__ = AsyncMock(return_value=None)
-            mock_session_instance.post = Mock(return_value=mock_context)
-            mock_session.return_value = mock_session_instance
+        # Should raise WhisperError, which is a ClientError
+        with pytest.raises(WhisperError) as exc_info:
+            await handler.transcribe_audio(fake_audio_path)
 
-            # Should raise ClientError
-            with pytest.raises(ClientError):
-                await handler.transcribe_audio(audio_path)
+        assert isinstance(exc_info.value, ClientError)
+        assert exc_info.value.status == 400
+        assert len(exc_info.value.body) == ERROR_BODY_LIMIT
+        assert response.json_calls == 0
 
 
 class TestSaveToMarkdown:
     """Tests for save_to_markdown method."""
 
-    @pytest.mark.asyncio
-    async def test_save_to_markdown_new_file(self, mock_transcription_env_vars: None, temp_dir: Path) -> None:
+    @pytest.fixture(scope="class")
+    @classmethod
+    def markdown_dir(cls, temp_base: Path | None) -> Iterator[Path]:
+        """Create one daily note directory for the class."""
+        with tempfile.TemporaryDirectory(dir=temp_base) as tmp_dir:
+            yield Path(tmp_dir)
+
+    @pytest_asyncio.fixture(scope="class", loop_scope="session")
+    @classmethod
+    async def handler(cls, transcription_settings: Settings, markdown_dir: Path) -> AsyncIterator[TranscriptionHandler]:
+        """Create one handler for the class writing notes to markdown_dir, closed once its tests finish."""
+        handler = TranscriptionHandler(dataclasses.replace(transcription_settings, transcription_output_dir=markdown_dir))
+        yield handler
+        await handler.close()
+
+    @pytest.fixture(autouse=True)
+    def _stub_template(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Replace the daily template with a constant header; its content is covered by TestGenerateDailyTemplate."""
+        monkeypatch.setattr(TranscriptionHandler, "_generate_daily_template", lambda self, date: "---\ntags:\n---\n[[stub]] Week 0\n")
+
+    @pytest.fixture(autouse=True)
+    def _clean_markdown_dir(self, markdown_dir: Path) -> Iterator[None]:
+        """Remove daily notes after each test so every test starts with no note."""
+        yield
+        with os.scandir(markdown_dir) as entries:
+            for entry in entries:
+                os.unlink(entry.path)
+
+    async def test_save_to_markdown_new_file(self, handler: TranscriptionHandler) -> None:
         """Test saving transcript to new markdown file."""
-        # Override output directory to use temp_dir
-        import os
-
-        os.environ["TRANSCRIPTION_OUTPUT_DIR"] = str(temp_dir)
-
-        settings = Settings.from_env()
-        handler = TranscriptionHandler(settings)
-
         # Execute
         transcript = "Test transcription content."
         result_path = await handler.save_to_markdown("test.ogg", transcript)
@@ -206,16 +323,8 @@ class TestSaveToMarkdown:
         assert "test.ogg" in content
         assert transcript in content
 
-    @pytest.mark.asyncio
-    async def test_save_to_markdown_append_existing(self, mock_transcription_env_vars: None, temp_dir: Path) -> None:
+    async def test_save_to_markdown_append_existing(self, handler: TranscriptionHandler) -> None:
         """Test appending transcript to existing markdown file."""
-        import os
-
-        os.environ["TRANSCRIPTION_OUTPUT_DIR"] = str(temp_dir)
-
-        settings = Settings.from_env()
-        handler = TranscriptionHandler(settings)
-
         # Create first entry
         transcript1 = "First transcription."
         result_path1 = await handler.save_to_markdown("audio1.ogg", transcript1)
@@ -227,77 +336,148 @@ class TestSaveToMarkdown:
         # Should be same file
         assert result_path1 == result_path2
 
-        # Read and verify content
-        content = result_path2.read_text(encoding="utf-8")
+        # Read once as bytes; membership checks don't need a decode
+        data = result_path2.read_bytes()
 
         # Should contain template header only once
-        breadcrumb_count = content.count("[[")
-        assert breadcrumb_count > 0
+        assert data.find(b"[[") != -1
+        assert data.count(b"tags:") == 1
 
         # Should contain both transcripts
-        assert "audio1.ogg" in content
-        assert transcript1 in content
-        assert "audio2.ogg" in content
-        assert transcript2 in content
+        assert b"audio1.ogg" in data
+        assert transcript1.encode() in data
+        assert b"audio2.ogg" in data
+        assert transcript2.encode() in data
 
-    @pytest.mark.asyncio
-    async def test_save_to_markdown_filename_format(self, mock_transcription_env_vars: None, temp_dir: Path) -> None:
-        """Test that markdown filename follows YYYY-MM-DD.md format."""
-        import os
+    async def test_save_to_markdown_empty_transcript(self, handler: TranscriptionHandler, markdown_dir: Path) -> None:
+        """Test whitespace-only transcripts don't touch the daily note."""
+        result_path = await handler.save_to_markdown("silence.ogg", "  \n")
+
+        assert result_path.parent == markdown_dir
+        assert not result_path.exists()
+
+    async def test_save_to_markdown_coalesces_concurrent_writes(self, handler: TranscriptionHandler) -> None:
+        """Test concurrent saves share one open/append and a single header."""
+        with patch.object(handler, "_write_markdown", wraps=handler._write_markdown) as mock_write:
+            paths = await asyncio.gather(*(handler.save_to_markdown(f"audio{i}.ogg", f"Entry {i}.") for i in range(3)))
+
+        assert len(set(paths)) == 1
+        assert mock_write.call_count == 1
+        content = paths[0].read_text(encoding="utf-8")
+        assert content.count("tags:") == 1
+        assert all(f"Entry {i}." in content for i in range(3))
+
+    async def test_close_writes_pending_notes(self, handler: TranscriptionHandler) -> None:
+        """Test close() writes entries still queued instead of leaving their saves waiting."""
+        saves = [asyncio.create_task(handler.save_to_markdown(f"audio{i}.ogg", f"Entry {i}.")) for i in range(3)]
+        # Let every save queue its entry; none has been written yet
+        await asyncio.sleep(0)
 
-        os.environ["TRANSCRIPTION_OUTPUT_DIR"] = str(temp_dir)
+        await asyncio.wait_for(handler.close(), timeout=1)
+        paths = await asyncio.wait_for(asyncio.gather(*saves), timeout=1)
+
+        content = paths[0].read_text(encoding="utf-8")
+        assert all(f"Entry {i}." in content for i in range(3))
+
+    async def test_save_to_markdown_completes_short_write(self, handler: TranscriptionHandler, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test a short writev is finished with plain writes."""
+        real_write = os.write
+        monkeypatch.setattr("src.transcription.os.writev", lambda fd, chunks: real_write(fd, chunks[0][:10]))
+
+        result_path = await handler.save_to_markdown("test.ogg", "日本語のテスト")
+
+        content = result_path.read_text(encoding="utf-8")
+        assert content.count("tags:") == 1
+        assert content.endswith("日本語のテスト\n")
 
-        settings = Settings.from_env()
-        handler = TranscriptionHandler(settings)
+        await handler.close()
 
+    async def test_save_to_markdown_filename_format(self, handler: TranscriptionHandler) -> None:
+        """Test that markdown filename follows YYYY-MM-DD.md format."""
         result_path = await handler.save_to_markdown("test.ogg", "Test content")
 
         # Verify filename format
-        import re
-
-        pattern = r"^\d{4}-\d{2}-\d{2}\.md$"
-        assert re.match(pattern, result_path.name)
+        assert _MD_NAME_RE.match(result_path.name)
 
 
 class TestProcessTranscription:
     """Tests for process_transcription workflow."""
 
-    @pytest.mark.asyncio
     async def test_process_transcription_full_workflow(
         self,
-        mock_transcription_env_vars: None,
+        transcription_settings: Settings,
         temp_dir: Path,
-        mock_whisper_response: dict[str, str],
+        fake_audio_path: Path,
+        mock_whisper_response: Mapping[str, str],
+        client_session_mock: Mock,
     ) -> None:
         """Test complete transcription workflow."""
-        import os
-
-        os.environ["TRANSCRIPTION_OUTPUT_DIR"] = str(temp_dir)
-
-        settings = Settings.from_env()
-        handler = TranscriptionHandler(settings)
-
-        # Create test audio file
-        audio_path = temp_dir / "test.ogg"
-        audio_path.write_bytes(b"fake audio content")
+        handler = TranscriptionHandler(dataclasses.replace(transcription_settings, transcription_output_dir=temp_dir))
 
         # Mock Whisper API
-        with patch("aiohttp.ClientSession") as mock_session:
-            mock_response = AsyncMock()
-            mock_response.raise_for_status = Mock()
-            mock_response.json = AsyncMock(return_value=mock_whisper_response)
-
-            mock_context = AsyncMock()
-            mock_context.__aenter__ = AsyncMock(return_value=mock_response)
-            mock_context.__aexit__ = AsyncMock()
+        client_session_mock.return_value = _FakeSession(_FakeResponse(mock_whisper_response))
 
-            mock_session.return_value.__aenter__.return_value.post = Mock(return_value=mock_context)
+        # Execute full workflow
+        result_path = await handler.process_transcription(fake_audio_path, "test.ogg")
 
-            # Execute full workflow
-            result_path = await handler.process_transcription(audio_path, "test.ogg")
+        # Verify
+        assert result_path.exists()
+        content = result_path.read_text(encoding="utf-8")
+        assert "This is a test transcription result." in content
+        assert "test.ogg" in content
 
-            # Verify
-            assert result_path.exists()
-            content = result_path.read_text(encoding="utf-8")
-            assert "This is a test transcription result." in content
-            assert "test.ogg" in content
+    async def test_process_many_limits_concurrency(self, transcription_settings: Settings, temp_dir: Path) -> None:
+        """Test process_many runs jobs concurrently up to the configured limit."""
+        handler = TranscriptionHandler(dataclasses.replace(transcription_settings, max_concurrent_transcriptions=2))
+
+        running = 0
+        max_running = 0
+
+        async def transcribe(audio_path: Path) -> str:
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            if audio_path.name == "bad.ogg":
+                raise ValueError("Invalid Whisper API response")
+            return "text"
+
+        jobs = [(temp_dir / name, name) for name in ("a.ogg", "bad.ogg", "c.ogg", "d.ogg")]
+
+        with (
+            patch.object(handler, "transcribe_audio", side_effect=transcribe),
+            patch.object(handler, "save_to_markdown", AsyncMock(return_value=temp_dir / "note.md")),
+        ):
+            results = await handler.process_many(jobs)
+
+        assert max_running == 2
+        assert results[0] == temp_dir / "note.md"
+        assert isinstance(results[1], ValueError)
+
+    async def test_process_many_saves_outside_transcription_slot(self, transcription_settings: Settings, temp_dir: Path) -> None:
+        """Test a pending save does not hold the slot the next transcription needs."""
+        handler = TranscriptionHandler(dataclasses.replace(transcription_settings, max_concurrent_transcriptions=1))
+
+        second_started = asyncio.Event()
+
+        async def transcribe(audio_path: Path) -> str:
+            if audio_path.name == "b.ogg":
+                second_started.set()
+            return "text"
+
+        async def save(filename: str, transcript: str) -> Path:
+            # The first save only finishes once the second transcription is running
+            if filename == "a.ogg":
+                await asyncio.wait_for(second_started.wait(), timeout=1)
+            return temp_dir / "note.md"
+
+        jobs = [(temp_dir / name, name) for name in ("a.ogg", "b.ogg")]
+
+        with (
+            patch.object(handler, "transcribe_audio", side_effect=transcribe),
+            patch.object(handler, "save_to_markdown", side_effect=save),
+        ):
+            results = await handler.process_many(jobs)
+
+        assert results == [temp_dir / "note.md", temp_dir / "note.md"]